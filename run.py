@@ -14,7 +14,7 @@ sys.path.insert(0, str(project_root))
 sys.path.insert(0, str(project_root / 'src'))
 
 from src.config import config
-from src.utils import setup_logger, cleanup_old_files
+from src.utils import setup_logger, cleanup_old_files, list_files, tail_file
 
 
 def main():
@@ -122,19 +122,19 @@ def show_config():
 
 def show_logs():
     """显示最近日志"""
-    import subprocess
     log_file = config.LOGS_DIR / "cron_news.log"
     if log_file.exists():
         print(f"\n=== 最近新闻采集日志 ===")
-        subprocess.run(['tail', '-20', str(log_file)])
+        for line in tail_file(log_file, 20):
+            print(line)
     else:
         print("📝 暂无新闻采集日志文件")
     
     # 显示其他日志文件
-    log_files = list(config.LOGS_DIR.glob("*.log"))
+    log_files = list_files(config.LOGS_DIR, "*.log")
     if log_files:
         print(f"\n📁 可用日志文件: {len(log_files)}个")
-        for log_file in sorted(log_files)[-5:]:  # 显示最新5个
+        for log_file, _ in log_files[-5:]:  # 显示最新5个
             print(f"  - {log_file.name}")
 
 
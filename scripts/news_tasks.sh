@@ -50,36 +50,27 @@ import sys
 sys.path.append('src')
 from collectors import stock_news_collector
 from feishu_notify import send_completion_notice
-from datetime import datetime
+from config import config
+import time
 
-start_time = datetime.now()
+start_time = time.perf_counter()
 
 try:
-    # 获取采集前统计
-    stats_before = stock_news_collector.get_news_stats()
-    count_before = stats_before.get('total_news', 0)
+    # 执行采集，新增/重复条数由采集结果直接给出
+    success, new_count, existing_count = stock_news_collector.collect_news(
+        max_process_count=config.NEWS_MAX_PROCESS_COUNT
+    )
     
-    # 执行采集
-    success = stock_news_collector.collect_news(max_process_count=10)
-    
-    # 获取采集后统计
-    stats_after = stock_news_collector.get_news_stats()
-    count_after = stats_after.get('total_news', 0)
-    new_count = count_after - count_before
-    
-    end_time = datetime.now()
-    duration = (end_time - start_time).total_seconds()
+    duration = time.perf_counter() - start_time
     
     if success:
-        print(f'SUCCESS: 新增{new_count}条新闻，耗时{duration:.1f}秒')
+        print(f'SUCCESS: 新增{new_count}条新闻，重复{existing_count}条，耗时{duration:.1f}秒')
         
         # 发送成功通知
         details = {
             '采集耗时': f'{duration:.1f}秒',
-            '采集前总数': f'{count_before}条',
-            '采集后总数': f'{count_after}条',
             '新增新闻': f'{new_count}条',
-            '重复数据': f'{10 - new_count}条' if new_count <= 10 else '0条',
+            '重复数据': f'{existing_count}条',
             '数据来源': '东方财富全球财经快讯'
         }
         send_completion_notice('东方财富全球财经快讯采集', True, details)
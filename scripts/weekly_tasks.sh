@@ -61,7 +61,7 @@ log "3. 旧日志文件清理完成"
 # 4. 补充历史数据（如果有缺失）
 log "4. 开始补充近期历史数据..."
 start_date=$(date -v-7d +%Y%m%d)
-python3 src/main.py history --start-date "$start_date" --base-delay 1.0 --batch-delay 30.0 --batch-size 20 || log "WARNING: 历史数据补充可能失败，请检查"
+AKSHARE_RATE_LIMIT=1 python3 src/main.py history --start-date "$start_date" || log "WARNING: 历史数据补充可能失败，请检查"
 log "4. 历史数据补充完成"
 
 # 5. 发送飞书通知
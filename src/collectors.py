@@ -5,14 +5,102 @@
 """
 
 import akshare as ak
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
 from loguru import logger
+from postgrest.types import ReturnMethod
 import time
-from retry import retry
+import queue
+import threading
+from config import config
 from database import db
-import random
+from utils import RateLimiter, retry_with_backoff, install_shared_session
+
+# 字符串清洗所用的 dtype：安装了 pyarrow 时使用 Arrow 存储，strip/isin 走 Arrow 计算内核
+try:
+    import pyarrow  # noqa: F401
+    STRING_DTYPE = 'string[pyarrow]'
+except ImportError:
+    STRING_DTYPE = 'string'
+
+
+# 字符串清洗时视为空值的占位符
+NULL_STRINGS = ('nan', 'None', '')
+
+# 股票代码首位与所属市场的对应关系
+MARKET_BY_CODE_PREFIX = {
+    '0': '深交所', '2': '深交所', '3': '深交所',
+    '6': '上交所', '9': '上交所',
+    '8': '北交所'
+}
+
+# 个股资金流排名各周期字段后缀与数据库字段的对应关系（原始字段名为 周期 + 后缀，如 3日主力净流入-净额）
+FUND_FLOW_FIELD_SUFFIXES = {
+    '涨跌幅': 'pct_chg',
+    '主力净流入-净额': 'main_net_inflow_amount',
+    '主力净流入-净占比': 'main_net_inflow_rate',
+    '超大单净流入-净额': 'super_large_net_amount',
+    '超大单净流入-净占比': 'super_large_net_rate',
+    '大单净流入-净额': 'large_net_amount',
+    '大单净流入-净占比': 'large_net_rate',
+    '中单净流入-净额': 'medium_net_amount',
+    '中单净流入-净占比': 'medium_net_rate',
+    '小单净流入-净额': 'small_net_amount',
+    '小单净流入-净占比': 'small_net_rate'
+}
+
+# 预先生成各周期的字段映射
+FUND_FLOW_PERIOD_MAPPINGS = {
+    period: {f'{period}{suffix}': field for suffix, field in FUND_FLOW_FIELD_SUFFIXES.items()}
+    for period in ("今日", "3日", "5日", "10日")
+}
+
+# 所有采集器共享的 akshare 请求限速器（每秒最多 AKSHARE_RATE_LIMIT 次请求）
+akshare_rate_limiter = RateLimiter(config.AKSHARE_RATE_LIMIT)
+
+
+def _on_akshare_throttled(seconds: float):
+    """服务端限流时暂停所有采集线程的请求"""
+    logger.warning(f"akshare 请求被限流，暂停 {seconds:.1f} 秒")
+    akshare_rate_limiter.pause(seconds)
+
+
+def _is_non_retryable(e: Exception) -> bool:
+    """客户端错误（4xx，408/429 除外）重试也不会成功，直接放弃"""
+    status = getattr(getattr(e, 'response', None), 'status_code', None)
+    return status is not None and 400 <= status < 500 and status not in (408, 429)
+
+
+# 全市场实时行情快照缓存: (获取时间, DataFrame)，股票基础信息与最新行情共用
+_spot_cache: Optional[tuple] = None
+_spot_cache_lock = threading.Lock()
+
+
+# 延迟重试任务使用的后台调度器（首次使用时创建）
+_retry_scheduler = None
+_retry_scheduler_lock = threading.Lock()
+
+
+def _get_retry_scheduler():
+    """获取共享的后台调度器，所有延迟重试任务共用一个调度线程"""
+    global _retry_scheduler
+    
+    with _retry_scheduler_lock:
+        if _retry_scheduler is None:
+            from apscheduler.schedulers.background import BackgroundScheduler
+            _retry_scheduler = BackgroundScheduler(daemon=True)
+            _retry_scheduler.start()
+    
+    return _retry_scheduler
+
+
+# akshare 的 HTTP 请求复用同一个连接池，避免每次请求重新握手；响应 429/503 时按 Retry-After 暂停限速器
+# （只替换 akshare 模块内的 requests 引用，须在 import akshare 之后执行）
+if config.AKSHARE_HTTP_POOL_SIZE > 0:
+    install_shared_session(config.AKSHARE_HTTP_POOL_SIZE, on_throttle=_on_akshare_throttled)
 
 
 class BaseCollector:
@@ -21,53 +109,58 @@ class BaseCollector:
     def __init__(self):
         self.retry_count = 3
         self.retry_delay = 5
-        # 延时控制配置 - 更保守的设置
-        self.base_delay = 0.5   # 基础延时增加到0.5秒
-        self.random_delay = 0.8  # 随机延时增加到0.8秒
-        self.batch_delay = 10.0   # 批次间延时增加到10秒
-        self.batch_size = 50     # 批次大小减少到50
-    
-    def set_delay_config(self, base_delay: float = 0.2, random_delay: float = 0.3, 
-                        batch_delay: float = 2.0, batch_size: int = 100):
-        """设置延时配置"""
-        self.base_delay = base_delay
-        self.random_delay = random_delay
-        self.batch_delay = batch_delay
-        self.batch_size = batch_size
-        logger.info(f"延时配置已更新: 基础延时={base_delay}s, 随机延时={random_delay}s, 批次延时={batch_delay}s, 批次大小={batch_size}")
-    
-    def smart_delay(self, index: int = 0):
-        """智能延时控制"""
-        # 基础延时 + 随机延时
-        delay = self.base_delay + random.uniform(0, self.random_delay)
-        time.sleep(delay)
-        
-        # 每批次后增加额外延时
-        if index > 0 and index % self.batch_size == 0:
-            logger.info(f"批次延时: {self.batch_delay}s")
-            time.sleep(self.batch_delay)
+        # 并发采集线程数（请求频率统一由 akshare_rate_limiter 控制）
+        self.max_workers = config.AKSHARE_MAX_WORKERS
     
-    @retry(tries=3, delay=5)
+    @retry_with_backoff(max_retries=config.AKSHARE_RETRY_COUNT, delay=1.0, backoff=2.0,
+                        jitter=0.5, max_delay=30.0, giveup=_is_non_retryable)
     def safe_request(self, func, *args, **kwargs):
-        """安全的API请求，带重试机制"""
+        """安全的API请求，带重试机制和全局限速"""
         try:
-            return func(*args, **kwargs)
+            with akshare_rate_limiter:
+                return func(*args, **kwargs)
         except Exception as e:
             logger.error(f"API请求失败: {e}")
             raise
     
+    def get_spot_snapshot(self) -> pd.DataFrame:
+        """获取全市场实时行情快照（ak.stock_zh_a_spot_em）
+        
+        同一次任务中股票基础信息和最新行情都需要这份数据，
+        AKSHARE_SPOT_CACHE_TTL 秒内重复调用直接返回缓存的副本，不再重复请求。
+        """
+        global _spot_cache
+        
+        with _spot_cache_lock:
+            if _spot_cache is not None:
+                cached_at, cached_df = _spot_cache
+                if time.monotonic() - cached_at < config.AKSHARE_SPOT_CACHE_TTL:
+                    logger.info("使用缓存的全市场行情快照")
+                    return cached_df.copy()
+            
+            df = self.safe_request(ak.stock_zh_a_spot_em)
+            if not df.empty:
+                _spot_cache = (time.monotonic(), df)
+            return df.copy()
+    
     def clean_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
         """清理DataFrame数据"""
         if df.empty:
             return df
         
-        # 替换无穷大值
-        df = df.replace([float('inf'), float('-inf')], None)
+        # 替换无穷大值：只处理浮点列并置为 NaN，保持 float64 类型不被提升为 object
+        # 大多数数据不含无穷大值，此时不重写任何列
+        num = df.select_dtypes(include=[np.floating])
+        if not num.empty:
+            is_inf = np.isinf(num.to_numpy())
+            if is_inf.any():
+                df[num.columns] = num.where(~is_inf, np.nan)
         
-        # 清理字符串列的空格
+        # 清理字符串列的空格：转为 StringDtype 后一次 strip，再用掩码把空值占位符置为 None
         for col in df.select_dtypes(include=['object']).columns:
-            df[col] = df[col].astype(str).str.strip()
-            df[col] = df[col].replace(['nan', 'None', ''], None)
+            values = df[col].astype(STRING_DTYPE).str.strip()
+            is_null = values.isna() | values.isin(NULL_STRINGS)
+            df[col] = values.astype(object).where(~is_null, None)
         
         return df
 
@@ -75,6 +168,16 @@ class BaseCollector:
 class StockBasicCollector(BaseCollector):
     """股票基础信息采集器"""
     
+    # 东财实时行情字段映射
+    SPOT_COLUMN_MAPPING = {
+        '代码': 'stock_code',
+        '名称': 'stock_name',
+        '总市值': 'total_share',  # 用总市值近似代替总股本
+        '流通市值': 'float_share',  # 用流通市值近似代替流通股本
+        '市盈率-动态': 'pe_ratio',  # 临时字段，用于判断ST等
+        '市净率': 'pb_ratio'  # 临时字段
+    }
+    
     def collect(self) -> bool:
         """采集股票基础信息"""
         logger.info("开始采集股票基础信息...")
@@ -82,7 +185,7 @@ class StockBasicCollector(BaseCollector):
         try:
             # 获取更全面的A股股票信息（东财数据源）
             logger.info("正在从东财获取股票列表...")
-            stock_em = self.safe_request(ak.stock_zh_a_spot_em)
+            stock_em = self.get_spot_snapshot()
             
             if stock_em.empty:
                 logger.warning("东财股票信息为空，尝试备用数据源...")
@@ -93,60 +196,43 @@ class StockBasicCollector(BaseCollector):
                     return False
                 
                 # 重命名列
-                stock_basic = stock_basic.rename(columns={
+                stock_basic.rename(columns={
                     'code': 'stock_code',
                     'name': 'stock_name'
-                })
+                }, inplace=True)
                 # 添加缺失字段
-                stock_basic['exchange'] = stock_basic['stock_code'].apply(self._get_market_by_code)
+                stock_basic['exchange'] = self._get_market_by_codes(stock_basic['stock_code'])
                 stock_basic['update_time'] = datetime.now()
                 
             else:
                 # 使用东财数据，映射到模型字段
                 logger.info(f"获取到 {len(stock_em)} 只股票的信息")
                 
-                # 字段映射
-                column_mapping = {
-                    '代码': 'stock_code',
-                    '名称': 'stock_name',
-                    '总市值': 'total_share',  # 用总市值近似代替总股本
-                    '流通市值': 'float_share',  # 用流通市值近似代替流通股本
-                    '市盈率-动态': 'pe_ratio',  # 临时字段，用于判断ST等
-                    '市净率': 'pb_ratio'  # 临时字段
-                }
-                
-                # 创建基础信息DataFrame
-                stock_basic = pd.DataFrame()
-                for old_col, new_col in column_mapping.items():
-                    if old_col in stock_em.columns:
-                        stock_basic[new_col] = stock_em[old_col]
+                # 创建基础信息DataFrame：只取映射中存在的字段后统一重命名
+                source_columns = stock_em.columns.intersection(list(self.SPOT_COLUMN_MAPPING), sort=False)
+                stock_basic = stock_em[source_columns].rename(columns=self.SPOT_COLUMN_MAPPING)
                 
                 # 添加派生字段
                 if 'stock_code' in stock_basic.columns:
                     # 交易所判断
-                    stock_basic['exchange'] = stock_basic['stock_code'].apply(self._get_market_by_code)
+                    stock_basic['exchange'] = self._get_market_by_codes(stock_basic['stock_code'])
                     
                     # ST判断（通过股票名称判断）
                     if 'stock_name' in stock_basic.columns:
-                        stock_basic['is_st'] = stock_basic['stock_name'].str.contains('ST|st', regex=True, na=False)
+                        stock_basic['is_st'] = stock_basic['stock_name'].str.contains('ST', case=False, regex=False, na=False)
                     
                     # 状态字段（简单设为正常）
                     stock_basic['status'] = '正常'
                 
                 # 移除临时字段
-                temp_fields = ['pe_ratio', 'pb_ratio']
-                for field in temp_fields:
-                    if field in stock_basic.columns:
-                        stock_basic = stock_basic.drop(columns=[field])
+                stock_basic = stock_basic.drop(columns=['pe_ratio', 'pb_ratio'], errors='ignore')
                 
                 # 添加更新时间
                 stock_basic['update_time'] = datetime.now()
             
             # 数据类型转换和清理
-            if 'total_share' in stock_basic.columns:
-                stock_basic['total_share'] = pd.to_numeric(stock_basic['total_share'], errors='coerce')
-            if 'float_share' in stock_basic.columns:
-                stock_basic['float_share'] = pd.to_numeric(stock_basic['float_share'], errors='coerce')
+            share_fields = stock_basic.columns.intersection(['total_share', 'float_share'], sort=False)
+            stock_basic[share_fields] = stock_basic[share_fields].apply(pd.to_numeric, errors='coerce')
             
             # 清理数据
             stock_basic = self.clean_dataframe(stock_basic)
@@ -155,7 +241,7 @@ class StockBasicCollector(BaseCollector):
             stock_basic = stock_basic.dropna(subset=['stock_code'])
             
             logger.info(f"准备插入 {len(stock_basic)} 条股票基础信息")
-            logger.info(f"数据列: {stock_basic.columns.tolist()}")
+            logger.opt(lazy=True).debug("数据列: {}", lambda: stock_basic.columns.tolist())
             
             # 插入数据库
             success = db.upsert_dataframe(
@@ -166,6 +252,8 @@ class StockBasicCollector(BaseCollector):
             
             if success:
                 logger.info(f"成功采集股票基础信息 {len(stock_basic)} 条")
+                # 股票列表可能变化，刷新缓存
+                db.invalidate_stock_list_cache()
             
             return success
             
@@ -178,26 +266,69 @@ class StockBasicCollector(BaseCollector):
         if not stock_code:
             return '未知'
         
-        code = str(stock_code)
-        if code.startswith('0') or code.startswith('2') or code.startswith('3'):
-            return '深交所'
-        elif code.startswith('6') or code.startswith('9'):
-            return '上交所'
-        elif code.startswith('8'):
-            return '北交所'
-        else:
-            return '其他'
+        return MARKET_BY_CODE_PREFIX.get(str(stock_code)[0], '其他')
+    
+    def _get_market_by_codes(self, stock_codes: pd.Series) -> pd.Series:
+        """根据股票代码批量判断所属市场（按首位字符向量化映射）"""
+        codes = stock_codes.astype('string')
+        markets = codes.str[0].map(MARKET_BY_CODE_PREFIX).astype(object).fillna('其他')
+        return markets.where(codes.fillna('') != '', '未知')
 
 
 class DailyQuoteCollector(BaseCollector):
     """日线行情采集器"""
     
-    def collect_stock_history(self, stock_code: str, start_date: str, 
-                            end_date: Optional[str] = None) -> bool:
-        """采集单个股票的历史数据"""
+    # 跨股票累积的行情行数达到该阈值时批量写入一次（PostgreSQL 超过 1 万行收益不再明显）
+    history_flush_rows = 10000
+    # 缓冲区中最早的行情等待超过该秒数仍未凑满阈值时也写入，避免采集较慢时数据长时间滞留内存
+    history_flush_seconds = 30.0
+    # 采集线程与写入线程之间的队列容量（按股票计），队列满时采集方阻塞等待写入
+    history_queue_size = 50
+    
+    # 历史行情字段映射
+    HISTORY_COLUMN_MAPPING = {
+        '日期': 'trade_date',
+        '股票代码': 'stock_code',
+        '开盘': 'open',
+        '最高': 'high',
+        '最低': 'low',
+        '收盘': 'close',
+        '涨跌额': 'change',
+        '涨跌幅': 'pct_chg',
+        '成交量': 'volume',
+        '成交额': 'amount',
+        '振幅': 'amplitude',
+        '换手率': 'turnover_rate'
+    }
+    
+    # 实时行情字段映射（只选择数据库中存在的核心行情字段）
+    SPOT_COLUMN_MAPPING = {
+        '代码': 'stock_code',
+        '最新价': 'close',
+        '涨跌额': 'change',
+        '涨跌幅': 'pct_chg',
+        '今开': 'open',
+        '最高': 'high',
+        '最低': 'low',
+        '成交量': 'volume',
+        '成交额': 'amount'
+    }
+    
+    def fetch_stock_history(self, stock_code: str, start_date: str, 
+                            end_date: Optional[str] = None,
+                            now: Optional[datetime] = None) -> Optional[pd.DataFrame]:
+        """获取并清洗单个股票的历史数据（不写入数据库）
+        
+        Args:
+            now: 本批次的更新时间，批量采集时由调用方统一传入
+        
+        Returns:
+            清洗后的 DataFrame，无数据时返回空 DataFrame，请求失败返回 None
+        """
         try:
+            now = now or datetime.now()
             if end_date is None:
-                end_date = datetime.now().strftime('%Y%m%d')
+                end_date = now.strftime('%Y%m%d')
             
             logger.info(f"采集股票 {stock_code} 从 {start_date} 到 {end_date} 的行情数据")
             
@@ -213,107 +344,255 @@ class DailyQuoteCollector(BaseCollector):
             
             if df.empty:
                 logger.warning(f"股票 {stock_code} 无历史数据")
-                return True
+                return df
             
             # 重命名列
-            column_mapping = {
-                '日期': 'trade_date',
-                '股票代码': 'stock_code',
-                '开盘': 'open',
-                '最高': 'high',
-                '最低': 'low',
-                '收盘': 'close',
-                '涨跌额': 'change',
-                '涨跌幅': 'pct_chg',
-                '成交量': 'volume',
-                '成交额': 'amount',
-                '振幅': 'amplitude',
-                '换手率': 'turnover_rate'
-            }
-            
-            df = df.rename(columns=column_mapping)
+            df.rename(columns=self.HISTORY_COLUMN_MAPPING, inplace=True)
             df['stock_code'] = stock_code
-            df['update_time'] = datetime.now()
+            df['update_time'] = now
             
-            # 数据类型转换
+            # 数据类型转换：保持 datetime64 列，避免逐行生成 date 对象
             if 'trade_date' in df.columns:
-                df['trade_date'] = pd.to_datetime(df['trade_date']).dt.date
+                df['trade_date'] = pd.to_datetime(
+                    df['trade_date'], format='%Y-%m-%d'
+                ).to_numpy().astype('datetime64[D]')
             
             # 清理数据
-            df = self.clean_dataframe(df)
-            
-            # 插入数据库
-            success = db.upsert_dataframe(
-                df, 
-                'daily_quote', 
-                ['stock_code', 'trade_date']
-            )
-            
-            if success:
-                logger.info(f"成功采集股票 {stock_code} 行情数据 {len(df)} 条")
-            
-            # 延时控制在调用方处理
-            
-            return success
+            return self.clean_dataframe(df)
             
         except Exception as e:
             logger.error(f"采集股票 {stock_code} 行情数据失败: {e}")
+            return None
+    
+    def collect_stock_history(self, stock_code: str, start_date: str, 
+                            end_date: Optional[str] = None) -> bool:
+        """采集单个股票的历史数据"""
+        df = self.fetch_stock_history(stock_code, start_date, end_date)
+        if df is None:
             return False
+        if df.empty:
+            return True
+        
+        # 插入数据库
+        success = db.upsert_dataframe(
+            df, 
+            'daily_quote', 
+            ['stock_code', 'trade_date'],
+            method='copy'
+        )
+        
+        if success:
+            logger.info(f"成功采集股票 {stock_code} 行情数据 {len(df)} 条")
+        
+        # 延时控制在调用方处理
+        
+        return success
     
     def collect_all_stocks_history(self, start_date: str, 
                                  end_date: Optional[str] = None, 
-                                 enable_resume: bool = True) -> bool:
-        """采集所有股票的历史数据，支持断点续传"""
+                                 enable_resume: bool = True,
+                                 max_workers: Optional[int] = None) -> bool:
+        """采集所有股票的历史数据，支持断点续传
+        
+        akshare 接口为同步阻塞调用，耗时主要在网络往返上，
+        因此使用有界线程池并发采集，并发数由 max_workers 控制。
+        采集结果通过有界队列交给独立的写入线程，写入线程累积到 history_flush_rows 行
+        （或最早缓冲的数据超过 history_flush_seconds 秒）时合并为一次 upsert，网络采集与数据库写入互不阻塞。
+        """
         logger.info("开始采集所有股票历史行情数据...")
         
-        # 获取股票列表
-        stock_list = db.get_stock_list()
+        # 获取股票列表（按代码排序，保证采集顺序稳定）
+        stock_list = db.get_stock_list()  # 已按代码升序
         if not stock_list:
             logger.error("无法获取股票列表")
             return False
         
+        max_workers = max_workers or self.max_workers
+        # 整个批次共用同一个结束日期和更新时间
+        now = datetime.now()
+        if end_date is None:
+            end_date = now.strftime('%Y%m%d')
         success_count = 0
         skip_count = 0
         total_count = len(stock_list)
-        logger.info(f"股票列表数量: {total_count}")
-        for i, stock_code in enumerate(stock_list, 1):
-            logger.info(f"处理进度: {i}/{total_count} - {stock_code}")
-            
-            # 断点续传检查
-            if enable_resume:
-                latest_date = db.get_latest_date('daily_quote', 'trade_date', stock_code)
-                if latest_date:
-                    # 检查是否已经有完整的数据
-                    if end_date and latest_date >= end_date:
-                        logger.info(f"股票 {stock_code} 数据已存在，跳过")
-                        skip_count += 1
-                        continue
-                    # 从最新日期的下一天开始采集
-                    resume_start_date = (datetime.strptime(latest_date, '%Y%m%d') + timedelta(days=1)).strftime('%Y%m%d')
-                    if resume_start_date > start_date:
-                        logger.info(f"股票 {stock_code} 从 {resume_start_date} 开始续传")
-                        start_date_for_stock = resume_start_date
-                    else:
-                        start_date_for_stock = start_date
-                else:
-                    start_date_for_stock = start_date
-            else:
-                start_date_for_stock = start_date
-            
-            # 采集数据
-            if self.collect_stock_history(stock_code, start_date_for_stock, end_date):
-                success_count += 1
-            
-            # 智能延时控制
-            self.smart_delay(i)
+        logger.info(f"股票列表数量: {total_count}，并发数: {max_workers}")
+        
+        # 断点续传：一次性获取所有股票的最新日期并批量换算为续传起始日期，避免逐只查询和解析
+        latest_dates = db.get_latest_dates('daily_quote', 'trade_date') if enable_resume else None
+        resume_dates = self._to_resume_dates(latest_dates) if latest_dates is not None else None
+        
+        # 写入线程：从队列中取出各股票行情，分批写入数据库
+        write_queue: queue.Queue = queue.Queue(maxsize=self.history_queue_size)
+        written = [0]
+        writer = threading.Thread(
+            target=self._history_writer,
+            args=(write_queue, written),
+            name='history-writer',
+            daemon=True
+        )
+        writer.start()
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # 按滑动窗口提交任务：同时在途的任务数不超过并发数的2倍，
+            # 写入队列满时主线程阻塞，不再提交新任务，已完成的结果不会在内存中堆积
+            tasks = iter(enumerate(stock_list, 1))
+            window = max_workers * 2
+            pending = set()
+            done_count = 0
+            
+            def submit_more():
+                for i, stock_code in tasks:
+                    pending.add(executor.submit(self._fetch_stock_with_resume, i, total_count,
+                                                stock_code, start_date, end_date, enable_resume,
+                                                resume_dates, now))
+                    if len(pending) >= window:
+                        break
             
-            # 每100只股票打印一次进度
-            if i % 100 == 0:
-                logger.info(f"已处理 {i}/{total_count} 只股票，成功 {success_count} 只，跳过 {skip_count} 只")
+            try:
+                submit_more()
+                while pending:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        pending.discard(future)
+                        done_count += 1
+                        status, df = future.result()
+                        if status == 'skipped':
+                            skip_count += 1
+                        elif status == 'success':
+                            if df.empty:
+                                success_count += 1
+                            else:
+                                write_queue.put(df)
+                        
+                        # 每100只股票打印一次进度
+                        if done_count % 100 == 0:
+                            logger.info(f"已处理 {done_count}/{total_count} 只股票，成功 {success_count} 只，跳过 {skip_count} 只")
+                    submit_more()
+            except KeyboardInterrupt:
+                logger.warning("收到中断信号，取消尚未开始的采集任务...")
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+            finally:
+                # 通知写入线程结束并等待剩余数据写完（中断时也保留已采集的行情）
+                write_queue.put(None)
+                writer.join()
+                success_count += written[0]
         
         logger.info(f"历史数据采集完成: 总计 {total_count} 只股票，成功 {success_count} 只，跳过 {skip_count} 只")
         return success_count > 0
     
+    def _fetch_stock_with_resume(self, index: int, total_count: int, stock_code: str,
+                                 start_date: str, end_date: Optional[str],
+                                 enable_resume: bool,
+                                 resume_dates: Optional[Dict[str, str]] = None,
+                                 now: Optional[datetime] = None) -> tuple:
+        """获取单只股票历史数据（线程池任务）
+        
+        Args:
+            resume_dates: 预先批量计算的 {股票代码: 续传起始日期}，为 None 时逐只查询数据库
+            now: 本批次的更新时间
+        
+        Returns:
+            (状态, DataFrame)，状态为 success / skipped / failed
+        """
+        logger.info(f"处理进度: {index}/{total_count} - {stock_code}")
+        
+        start_date_for_stock = start_date
+        
+        # 断点续传检查
+        if enable_resume:
+            if resume_dates is not None:
+                resume_start_date = resume_dates.get(stock_code)
+            else:
+                latest_date = db.get_latest_date('daily_quote', 'trade_date', stock_code)
+                resume_start_date = self._to_resume_dates({stock_code: latest_date})[stock_code] if latest_date else None
+            if resume_start_date:
+                # 检查是否已经有完整的数据（最新日期不早于结束日期）
+                if end_date and resume_start_date > end_date:
+                    logger.info(f"股票 {stock_code} 数据已存在，跳过")
+                    return 'skipped', None
+                # 从最新日期的下一天开始采集
+                if resume_start_date > start_date:
+                    logger.info(f"股票 {stock_code} 从 {resume_start_date} 开始续传")
+                    start_date_for_stock = resume_start_date
+        
+        # 采集数据（请求频率由 safe_request 的全局令牌桶控制，无需固定延时）
+        df = self.fetch_stock_history(stock_code, start_date_for_stock, end_date, now)
+        
+        return ('failed', None) if df is None else ('success', df)
+    
+    @staticmethod
+    def _to_resume_dates(latest_dates: Dict[str, str]) -> Dict[str, str]:
+        """把 {代码: 最新日期} 批量转换为 {代码: 续传起始日期（最新日期的下一天）}，日期均为 YYYYMMDD"""
+        if not latest_dates:
+            return {}
+        
+        next_days = pd.to_datetime(list(latest_dates.values()), format='%Y%m%d') + pd.Timedelta(days=1)
+        return dict(zip(latest_dates.keys(), next_days.strftime('%Y%m%d')))
+    
+    def _history_writer(self, write_queue: queue.Queue, written: List[int]):
+        """写入线程：批量消费队列中的行情，收到 None 后写入剩余数据并退出
+        
+        Args:
+            write_queue: 采集线程推送的单只股票行情队列
+            written: 单元素列表，累计写入成功的股票数
+        """
+        buffer: List[pd.DataFrame] = []
+        buffered_rows = 0
+        oldest_at = 0.0  # 缓冲区中最早一条行情的入队时间
+        
+        while True:
+            try:
+                df = write_queue.get(timeout=1)
+            except queue.Empty:
+                pass
+            else:
+                if df is None:
+                    break
+                if not buffer:
+                    oldest_at = time.monotonic()
+                buffer.append(df)
+                buffered_rows += len(df)
+            
+            # 行数达到阈值，或最早缓冲的数据已等待足够久时写入（按缓冲时长而非单次空闲判断，
+            # 限速较低、行情逐只到达时仍能跨股票合并写入）
+            if buffer and (buffered_rows >= self.history_flush_rows
+                           or time.monotonic() - oldest_at >= self.history_flush_seconds):
+                written[0] += self._flush_history_buffer(buffer)
+                buffered_rows = 0
+        
+        written[0] += self._flush_history_buffer(buffer)
+    
+    def _flush_history_buffer(self, buffer: List[pd.DataFrame]) -> int:
+        """合并缓冲区中多只股票的行情并一次性 upsert，返回写入成功的股票数
+        
+        任何异常都在这里记录并吞掉：写入线程必须持续消费队列，否则采集线程会阻塞在队列 put 上
+        """
+        if not buffer:
+            return 0
+        
+        stock_count = len(buffer)
+        try:
+            merged = pd.concat(buffer, ignore_index=True)
+            success = db.upsert_dataframe(
+                merged,
+                'daily_quote',
+                ['stock_code', 'trade_date'],
+                method='copy'
+            )
+        except Exception as e:
+            logger.error(f"批量写入 {stock_count} 只股票行情数据异常: {e}")
+            return 0
+        finally:
+            buffer.clear()
+        
+        if success:
+            logger.info(f"成功批量写入 {stock_count} 只股票行情数据 {len(merged)} 条")
+            return stock_count
+        
+        logger.error(f"批量写入 {stock_count} 只股票行情数据失败")
+        return 0
+    
     def collect_latest_quotes_batch(self) -> bool:
         """批量采集最新行情数据（避免频繁API请求）"""
         logger.info("开始批量采集最新行情数据...")
@@ -321,7 +600,7 @@ class DailyQuoteCollector(BaseCollector):
         try:
             # 使用更稳定的批量接口获取所有股票最新数据
             logger.info("正在获取所有股票最新行情...")
-            df = self.safe_request(ak.stock_zh_a_spot_em)
+            df = self.get_spot_snapshot()
             
             if df.empty:
                 logger.warning("批量行情数据为空")
@@ -329,34 +608,21 @@ class DailyQuoteCollector(BaseCollector):
             
             logger.info(f"获取到 {len(df)} 只股票的最新行情")
             
-            # 只选择数据库中存在的核心行情字段
-            basic_columns = {
-                '代码': 'stock_code',
-                '最新价': 'close',
-                '涨跌额': 'change',
-                '涨跌幅': 'pct_chg',
-                '今开': 'open',
-                '最高': 'high',
-                '最低': 'low',
-                '成交量': 'volume',
-                '成交额': 'amount'
-            }
-            
-            # 创建新的DataFrame，只包含核心行情字段
-            processed_data = {}
-            for old_col, new_col in basic_columns.items():
-                if old_col in df.columns:
-                    processed_data[new_col] = df[old_col]
-                else:
-                    processed_data[new_col] = None
+            # 重命名后按目标字段重排，只保留核心行情字段（缺失的字段补为空值）
+            df_clean = df.rename(columns=self.SPOT_COLUMN_MAPPING).reindex(
+                columns=list(self.SPOT_COLUMN_MAPPING.values())
+            )
             
-            # 创建新的DataFrame
-            df_clean = pd.DataFrame(processed_data)
+            # 先剔除代码为空的行，没有有效数据时跳过后续转换和写入
+            df_clean.dropna(subset=['stock_code'], inplace=True)
+            if df_clean.empty:
+                logger.warning("最新行情数据中没有有效的股票代码")
+                return True
             
             # 添加交易日期（使用当前日期）
-            today = datetime.now().date()
-            df_clean['trade_date'] = today
-            df_clean['update_time'] = datetime.now()
+            now = datetime.now()
+            df_clean['trade_date'] = now.date()
+            df_clean['update_time'] = now
             
             # 清理数据
             df_clean = self.clean_dataframe(df_clean)
@@ -365,14 +631,10 @@ class DailyQuoteCollector(BaseCollector):
             try:
                 # 转换数值类型字段
                 numeric_fields = ['close', 'change', 'pct_chg', 'open', 'high', 'low', 'amount']
-                for field in numeric_fields:
-                    if field in df_clean.columns:
-                        df_clean[field] = pd.to_numeric(df_clean[field], errors='coerce')
+                df_clean[numeric_fields] = df_clean[numeric_fields].apply(pd.to_numeric, errors='coerce')
                 
-                # 成交量转换为整数
-                if 'volume' in df_clean.columns:
-                    df_clean['volume'] = pd.to_numeric(df_clean['volume'], errors='coerce')
-                    df_clean['volume'] = df_clean['volume'].fillna(0).astype('int64')
+                # 成交量转换为整数（reindex 后该列一定存在）
+                df_clean['volume'] = pd.to_numeric(df_clean['volume'], errors='coerce').fillna(0).astype('int64')
                 
             except Exception as e:
                 logger.warning(f"数据类型转换时出现警告: {e}")
@@ -381,13 +643,14 @@ class DailyQuoteCollector(BaseCollector):
             df_clean = df_clean.dropna(subset=['stock_code'])
             
             logger.info(f"准备插入 {len(df_clean)} 条最新行情数据")
-            logger.info(f"数据列: {df_clean.columns.tolist()}")
+            logger.opt(lazy=True).debug("数据列: {}", lambda: df_clean.columns.tolist())
             
             # 插入数据库
             success = db.upsert_dataframe(
                 df_clean, 
                 'daily_quote', 
-                ['stock_code', 'trade_date']
+                ['stock_code', 'trade_date'],
+                method='copy'
             )
             
             if success:
@@ -454,26 +717,31 @@ class IndexDataCollector(BaseCollector):
         
         success_count = 0
         has_data_count = 0  # 实际有数据的指数数量
+        now = datetime.now()
         
-        for i, (index_code, index_name) in enumerate(self.index_list, 1):
-            result = self.collect_index_history_with_data_check(index_code, index_name, start_date, end_date)
-            if result['success']:
-                success_count += 1
-            if result['has_data']:
-                has_data_count += 1
-            # 指数数据采集间隔延时
-            if i < len(self.index_list):  # 最后一个不需要延时
-                time.sleep(1.0)
+        # 各指数相互独立，并发采集（请求频率由全局限速器控制）
+        with ThreadPoolExecutor(max_workers=len(self.index_list)) as executor:
+            futures = [
+                executor.submit(self.collect_index_history_with_data_check,
+                                index_code, index_name, start_date, end_date, now)
+                for index_code, index_name in self.index_list
+            ]
+            for future in as_completed(futures):
+                result = future.result()
+                if result['success']:
+                    success_count += 1
+                if result['has_data']:
+                    has_data_count += 1
         
         # 检查是否所有指数都没有数据（可能数据源未更新）
         if has_data_count == 0 and success_count == len(self.index_list):
             logger.warning(f"所有指数在 {start_date} 都没有数据，可能数据源未更新")
             
             # 如果是当日数据且时间还早，建议延迟重试
-            current_hour = datetime.now().hour
-            if start_date == datetime.now().strftime('%Y%m%d') and current_hour < 20:
-                logger.info(f"建议 {retry_delay_hours} 小时后重试，当前时间: {datetime.now().strftime('%H:%M')}")
-                logger.info(f"可在 {(datetime.now() + timedelta(hours=retry_delay_hours)).strftime('%H:%M')} 后重新执行")
+            now = datetime.now()
+            if start_date == now.strftime('%Y%m%d') and now.hour < 20:
+                logger.info(f"建议 {retry_delay_hours} 小时后重试，当前时间: {now.strftime('%H:%M')}")
+                logger.info(f"可在 {(now + timedelta(hours=retry_delay_hours)).strftime('%H:%M')} 后重新执行")
                 
                 # 可以选择立即重试一次（等待1小时）
                 if self._should_retry_index_collection():
@@ -484,11 +752,13 @@ class IndexDataCollector(BaseCollector):
         return success_count > 0
 
     def collect_index_history_with_data_check(self, index_code: str, index_name: str,
-                                            start_date: str, end_date: Optional[str] = None) -> dict:
+                                            start_date: str, end_date: Optional[str] = None,
+                                            now: Optional[datetime] = None) -> dict:
         """采集指数历史数据并检查是否有数据"""
         try:
+            now = now or datetime.now()
             if end_date is None:
-                end_date = datetime.now().strftime('%Y%m%d')
+                end_date = now.strftime('%Y%m%d')
             
             logger.info(f"采集指数 {index_code}({index_name}) 从 {start_date} 到 {end_date} 的数据")
             
@@ -502,27 +772,39 @@ class IndexDataCollector(BaseCollector):
                 logger.warning(f"指数 {index_code} 无历史数据")
                 return {'success': True, 'has_data': False}
             
-            # 过滤日期范围
+            # 过滤日期范围（stock_zh_index_daily 不支持日期参数）
+            # 接口返回的数据按日期升序，在有序数组上二分查找起止位置后直接切片
             df['date'] = pd.to_datetime(df['date'])
-            start_dt = datetime.strptime(start_date, '%Y%m%d')
-            end_dt = datetime.strptime(end_date, '%Y%m%d')
-            df = df[(df['date'] >= start_dt) & (df['date'] <= end_dt)]
+            if not df['date'].is_monotonic_increasing:
+                df = df.sort_values('date', ignore_index=True)
+            dates = df['date'].to_numpy()
+            start_dt = np.datetime64(datetime.strptime(start_date, '%Y%m%d'))
+            end_dt = np.datetime64(datetime.strptime(end_date, '%Y%m%d'))
+            lo = np.searchsorted(dates, start_dt, side='left')
+            hi = np.searchsorted(dates, end_dt, side='right')
+            all_closes = df['close'].to_numpy(dtype=float)
+            df = df.iloc[lo:hi].copy()
             
             if df.empty:
                 logger.info(f"指数 {index_code} 在指定日期范围内无数据")
                 return {'success': True, 'has_data': False}
             
             # 重命名和添加列
-            df = df.rename(columns={'date': 'trade_date'})
+            df.rename(columns={'date': 'trade_date'}, inplace=True)
             df['index_code'] = index_code
             df['index_name'] = index_name
-            df['trade_date'] = df['trade_date'].dt.date
-            df['update_time'] = datetime.now()
-            
-            # 计算涨跌额和涨跌幅
-            df = df.sort_values('trade_date')
-            df['change'] = df['close'].diff()
-            df['pct_chg'] = df['close'].pct_change() * 100
+            df['trade_date'] = df['trade_date'].dt.normalize()
+            df['update_time'] = now
+            
+            # 计算涨跌额和涨跌幅（数据已按日期升序）
+            # 窗口第一天的前收盘价取自过滤前的完整序列，起始日之前没有数据时才为空
+            closes = all_closes[lo:hi]
+            prev = np.empty_like(closes)
+            prev[:1] = all_closes[lo - 1] if lo > 0 else np.nan
+            prev[1:] = closes[:-1]
+            change = closes - prev
+            df['change'] = change
+            df['pct_chg'] = change / prev * 100
             
             # 清理数据
             df = self.clean_dataframe(df)
@@ -531,7 +813,8 @@ class IndexDataCollector(BaseCollector):
             success = db.upsert_dataframe(
                 df,
                 'index_data',
-                ['index_code', 'trade_date']
+                ['index_code', 'trade_date'],
+                method='copy'
             )
             
             if success:
@@ -560,42 +843,46 @@ class IndexDataCollector(BaseCollector):
 
     def _retry_index_collection_later(self, start_date: str, end_date: Optional[str], 
                                     delay_hours: int) -> bool:
-        """延迟重试指数数据采集"""
-        import threading
-        import time as time_module
-        
-        def delayed_retry():
-            logger.info(f"等待 {delay_hours} 小时后重试指数数据采集...")
-            time_module.sleep(delay_hours * 3600)  # 转换为秒
-            
-            logger.info("开始重试指数数据采集...")
-            retry_result = self.collect_all_indexes_history(start_date, end_date, retry_delay_hours=0)
-            
-            if retry_result:
-                logger.info("重试成功：指数数据采集完成")
-                # 发送成功通知
-                try:
-                    from feishu_notify import send_completion_notice
-                    send_completion_notice(
-                        "指数数据重试采集",
-                        True,
-                        {
-                            "重试时间": datetime.now().strftime('%H:%M:%S'),
-                            "采集日期": start_date,
-                            "状态": "✅ 重试成功"
-                        }
-                    )
-                except:
-                    pass
-            else:
-                logger.warning("重试失败：指数数据仍然无法获取")
+        """延迟重试指数数据采集（由共享的后台调度器定时触发，不占用等待线程）"""
+        run_date = datetime.now() + timedelta(hours=delay_hours)
         
-        # 在后台线程中执行延迟重试
-        retry_thread = threading.Thread(target=delayed_retry, daemon=True)
-        retry_thread.start()
+        # 固定任务ID，重复安排时替换已有任务，同一时刻只保留一个待执行的重试
+        _get_retry_scheduler().add_job(
+            self._run_index_retry,
+            'date',
+            run_date=run_date,
+            args=[start_date, end_date],
+            id='index_history_retry',
+            replace_existing=True,
+            misfire_grace_time=None
+        )
         
-        logger.info(f"已启动后台重试任务，将在 {delay_hours} 小时后自动重试")
+        logger.info(f"已安排后台重试任务，将在 {delay_hours} 小时后（{run_date.strftime('%H:%M')}）自动重试")
         return True  # 返回True表示已安排重试
+    
+    def _run_index_retry(self, start_date: str, end_date: Optional[str]):
+        """执行指数数据重试采集"""
+        logger.info("开始重试指数数据采集...")
+        retry_result = self.collect_all_indexes_history(start_date, end_date, retry_delay_hours=0)
+        
+        if retry_result:
+            logger.info("重试成功：指数数据采集完成")
+            # 发送成功通知
+            try:
+                from feishu_notify import send_completion_notice
+                send_completion_notice(
+                    "指数数据重试采集",
+                    True,
+                    {
+                        "重试时间": datetime.now().strftime('%H:%M:%S'),
+                        "采集日期": start_date,
+                        "状态": "✅ 重试成功"
+                    }
+                )
+            except:
+                pass
+        else:
+            logger.warning("重试失败：指数数据仍然无法获取")
 
 
 class TradeCalendarCollector(BaseCollector):
@@ -606,10 +893,11 @@ class TradeCalendarCollector(BaseCollector):
         logger.info("开始采集完整交易日历...")
         
         try:
+            now = datetime.now()
             if start_year is None:
-                start_year = datetime.now().year - 2
+                start_year = now.year - 2
             if end_year is None:
-                end_year = datetime.now().year + 1
+                end_year = now.year + 1
             
             logger.info(f"采集年份范围: {start_year} - {end_year}")
             
@@ -620,39 +908,28 @@ class TradeCalendarCollector(BaseCollector):
                 logger.warning("交易日历数据为空")
                 return False
             
-            # 转换交易日期格式并创建集合用于快速查找
-            trade_dates_df['trade_date'] = pd.to_datetime(trade_dates_df['trade_date'])
-            trade_dates_set = set(trade_dates_df['trade_date'].dt.date)
+            # 转换交易日期格式
+            trade_dates = pd.DatetimeIndex(pd.to_datetime(trade_dates_df['trade_date'])).normalize().unique()
             
-            logger.info(f"获取到 {len(trade_dates_set)} 个交易日")
+            logger.info(f"获取到 {len(trade_dates)} 个交易日")
             
             # 2. 生成完整日历范围
             start_date = datetime(start_year, 1, 1).date()
             end_date = datetime(end_year, 12, 31).date()
             
-            calendar_data = []
-            current_date = start_date
-            
             logger.info(f"生成日期范围: {start_date} 到 {end_date}")
             
-            while current_date <= end_date:
-                # 判断是否为交易日
-                is_trade_day = current_date in trade_dates_set
-                
-                calendar_data.append({
-                    'calendar_date': current_date,
-                    'is_trade_day': is_trade_day,
-                    'update_time': datetime.now()
-                })
-                
-                current_date += timedelta(days=1)
-            
-            # 3. 转换为DataFrame
-            calendar_df = pd.DataFrame(calendar_data)
+            # 3. 一次生成所有日期并批量判断是否为交易日
+            calendar_dates = pd.date_range(start_date, end_date, freq='D')
+            calendar_df = pd.DataFrame({
+                'calendar_date': calendar_dates.date,
+                'is_trade_day': calendar_dates.isin(trade_dates),
+                'update_time': now
+            })
             
             # 统计信息
             total_days = len(calendar_df)
-            trade_days = sum(calendar_df['is_trade_day'])
+            trade_days = int(calendar_df['is_trade_day'].sum())
             non_trade_days = total_days - trade_days
             
             logger.info(f"生成完整日历数据 {total_days} 条")
@@ -686,6 +963,16 @@ class TradeCalendarCollector(BaseCollector):
 class StockHotRankCollector(BaseCollector):
     """股票人气榜采集器"""
     
+    # 人气榜字段映射
+    COLUMN_MAPPING = {
+        '当前排名': 'current_rank',
+        '代码': 'stock_code',
+        '股票名称': 'stock_name',
+        '最新价': 'latest_price',
+        '涨跌额': 'change',
+        '涨跌幅': 'pct_chg'
+    }
+    
     def collect_hot_rank(self) -> bool:
         """采集股票人气榜数据"""
         logger.info("开始采集股票人气榜数据...")
@@ -700,38 +987,33 @@ class StockHotRankCollector(BaseCollector):
             
             logger.info(f"获取到 {len(df)} 条人气榜数据")
             
-            # 字段映射
-            column_mapping = {
-                '当前排名': 'current_rank',
-                '代码': 'stock_code',
-                '股票名称': 'stock_name',
-                '最新价': 'latest_price',
-                '涨跌额': 'change',
-                '涨跌幅': 'pct_chg'
-            }
-            
             # 重命名列
-            df = df.rename(columns=column_mapping)
+            df.rename(columns=self.COLUMN_MAPPING, inplace=True)
+            
+            # 先剔除代码为空的行，没有有效数据时跳过后续转换和写入
+            df.dropna(subset=['stock_code'], inplace=True)
+            if df.empty:
+                logger.warning("榜单数据中没有有效的股票代码")
+                return True
             
             # 添加交易日期和更新时间
-            today = datetime.now().date()
-            df['trade_date'] = today
-            df['update_time'] = datetime.now()
+            now = datetime.now()
+            df['trade_date'] = now.date()
+            df['update_time'] = now
             
             # 数据类型转换
             numeric_fields = ['current_rank', 'latest_price', 'change', 'pct_chg']
-            for field in numeric_fields:
-                if field in df.columns:
-                    df[field] = pd.to_numeric(df[field], errors='coerce')
+            numeric_fields = df.columns.intersection(numeric_fields, sort=False)
+            df[numeric_fields] = df[numeric_fields].apply(pd.to_numeric, errors='coerce')
             
             # 清理数据
             df = self.clean_dataframe(df)
             
             # 移除空值行
-            df = df.dropna(subset=['stock_code', 'current_rank'])
+            df.dropna(subset=['stock_code', 'current_rank'], inplace=True)
             
             logger.info(f"准备插入 {len(df)} 条人气榜数据")
-            logger.info(f"数据列: {df.columns.tolist()}")
+            logger.opt(lazy=True).debug("数据列: {}", lambda: df.columns.tolist())
             
             # 插入数据库
             success = db.upsert_dataframe(
@@ -753,6 +1035,17 @@ class StockHotRankCollector(BaseCollector):
 class StockHotUpCollector(BaseCollector):
     """股票飙升榜采集器"""
     
+    # 飙升榜字段映射
+    COLUMN_MAPPING = {
+        '排名较昨日变动': 'rank_change',
+        '当前排名': 'current_rank',
+        '代码': 'stock_code',
+        '股票名称': 'stock_name',
+        '最新价': 'latest_price',
+        '涨跌额': 'change',
+        '涨跌幅': 'pct_chg'
+    }
+    
     def collect_hot_up(self) -> bool:
         """采集股票飙升榜数据"""
         logger.info("开始采集股票飙升榜数据...")
@@ -767,39 +1060,33 @@ class StockHotUpCollector(BaseCollector):
             
             logger.info(f"获取到 {len(df)} 条飙升榜数据")
             
-            # 字段映射
-            column_mapping = {
-                '排名较昨日变动': 'rank_change',
-                '当前排名': 'current_rank',
-                '代码': 'stock_code',
-                '股票名称': 'stock_name',
-                '最新价': 'latest_price',
-                '涨跌额': 'change',
-                '涨跌幅': 'pct_chg'
-            }
-            
             # 重命名列
-            df = df.rename(columns=column_mapping)
+            df.rename(columns=self.COLUMN_MAPPING, inplace=True)
+            
+            # 先剔除代码为空的行，没有有效数据时跳过后续转换和写入
+            df.dropna(subset=['stock_code'], inplace=True)
+            if df.empty:
+                logger.warning("榜单数据中没有有效的股票代码")
+                return True
             
             # 添加交易日期和更新时间
-            today = datetime.now().date()
-            df['trade_date'] = today
-            df['update_time'] = datetime.now()
+            now = datetime.now()
+            df['trade_date'] = now.date()
+            df['update_time'] = now
             
             # 数据类型转换
             numeric_fields = ['rank_change', 'current_rank', 'latest_price', 'change', 'pct_chg']
-            for field in numeric_fields:
-                if field in df.columns:
-                    df[field] = pd.to_numeric(df[field], errors='coerce')
+            numeric_fields = df.columns.intersection(numeric_fields, sort=False)
+            df[numeric_fields] = df[numeric_fields].apply(pd.to_numeric, errors='coerce')
             
             # 清理数据
             df = self.clean_dataframe(df)
             
             # 移除空值行
-            df = df.dropna(subset=['stock_code', 'current_rank'])
+            df.dropna(subset=['stock_code', 'current_rank'], inplace=True)
             
             logger.info(f"准备插入 {len(df)} 条飙升榜数据")
-            logger.info(f"数据列: {df.columns.tolist()}")
+            logger.opt(lazy=True).debug("数据列: {}", lambda: df.columns.tolist())
             
             # 插入数据库
             success = db.upsert_dataframe(
@@ -821,6 +1108,23 @@ class StockHotUpCollector(BaseCollector):
 class HsgtFundFlowCollector(BaseCollector):
     """沪深港通资金流向采集器"""
     
+    # 沪深港通资金流向字段映射
+    COLUMN_MAPPING = {
+        '交易日': 'trade_date',
+        '类型': 'type',
+        '板块': 'sector',
+        '资金方向': 'direction',
+        '交易状态': 'trade_status',
+        '成交净买额': 'net_buy_amount',
+        '资金净流入': 'net_inflow',
+        '当日资金余额': 'day_balance',
+        '上涨数': 'up_count',
+        '持平数': 'flat_count',
+        '下跌数': 'down_count',
+        '相关指数': 'related_index',
+        '指数涨跌幅': 'index_pct_chg'
+    }
+    
     def collect_hsgt_fund_flow(self) -> bool:
         """采集沪深港通资金流向数据"""
         logger.info("开始采集沪深港通资金流向数据...")
@@ -835,36 +1139,24 @@ class HsgtFundFlowCollector(BaseCollector):
             
             logger.info(f"获取到 {len(df)} 条沪深港通资金流向数据")
             
-            # 字段映射
-            column_mapping = {
-                '交易日': 'trade_date',
-                '类型': 'type',
-                '板块': 'sector',
-                '资金方向': 'direction',
-                '交易状态': 'trade_status',
-                '成交净买额': 'net_buy_amount',
-                '资金净流入': 'net_inflow',
-                '当日资金余额': 'day_balance',
-                '上涨数': 'up_count',
-                '持平数': 'flat_count',
-                '下跌数': 'down_count',
-                '相关指数': 'related_index',
-                '指数涨跌幅': 'index_pct_chg'
-            }
-            
             # 重命名列
-            df = df.rename(columns=column_mapping)
+            df.rename(columns=self.COLUMN_MAPPING, inplace=True)
             
-            # 数据类型转换
+            # 先剔除关键字段为空的行，没有有效数据时跳过后续转换和写入
+            df.dropna(subset=['trade_date', 'type', 'sector', 'direction'], inplace=True)
+            if df.empty:
+                logger.warning("沪深港通资金流向数据中没有关键字段完整的记录")
+                return True
+            
+            # 数据类型转换：保持 datetime64 列，避免逐行生成 date 对象
             if 'trade_date' in df.columns:
-                df['trade_date'] = pd.to_datetime(df['trade_date']).dt.date
+                df['trade_date'] = pd.to_datetime(df['trade_date']).dt.normalize()
             
             # 数值字段转换
             numeric_fields = ['trade_status', 'net_buy_amount', 'net_inflow', 'day_balance', 
                             'up_count', 'flat_count', 'down_count', 'index_pct_chg']
-            for field in numeric_fields:
-                if field in df.columns:
-                    df[field] = pd.to_numeric(df[field], errors='coerce')
+            numeric_fields = df.columns.intersection(numeric_fields, sort=False)
+            df[numeric_fields] = df[numeric_fields].apply(pd.to_numeric, errors='coerce')
             
             # 添加更新时间
             df['update_time'] = datetime.now()
@@ -876,7 +1168,7 @@ class HsgtFundFlowCollector(BaseCollector):
             df = df.dropna(subset=['trade_date', 'type', 'sector', 'direction'])
             
             logger.info(f"准备插入 {len(df)} 条沪深港通资金流向数据")
-            logger.info(f"数据列: {df.columns.tolist()}")
+            logger.opt(lazy=True).debug("数据列: {}", lambda: df.columns.tolist())
             
             # 插入数据库
             success = db.upsert_dataframe(
@@ -898,134 +1190,35 @@ class HsgtFundFlowCollector(BaseCollector):
 class StockFundFlowRankCollector(BaseCollector):
     """个股资金流排名采集器"""
     
+    # 各周期共用的基础字段映射
+    COLUMN_MAPPING = {
+        '序号': 'rank',
+        '代码': 'stock_code',
+        '名称': 'stock_name',
+        '最新价': 'latest_price'
+    }
+    
     def collect_fund_flow_rank(self, indicators: Optional[list] = None) -> bool:
-        """采集个股资金流排名数据"""
+        """采集个股资金流排名数据
+        
+        各周期数据相互独立，并发采集（请求频率由全局限速器控制）
+        """
         if indicators is None:
             indicators = ["今日", "3日", "5日", "10日"]
         
         logger.info("开始采集个股资金流排名数据...")
         
-        overall_success = True
-        today = datetime.now().date()
+        now = datetime.now()
         
-        for indicator in indicators:
-            logger.info(f"采集 {indicator} 资金流排名数据...")
-            
-            try:
-                # 获取指定周期的个股资金流排名
-                df = self.safe_request(ak.stock_individual_fund_flow_rank, indicator=indicator)
-                
-                if df.empty:
-                    logger.warning(f"{indicator} 个股资金流排名数据为空")
-                    overall_success = False
-                    continue
-                
-                logger.info(f"获取到 {len(df)} 条 {indicator} 个股资金流排名数据")
-                
-                # 字段映射 - 根据不同周期动态调整字段名
-                column_mapping = {
-                    '序号': 'rank',
-                    '代码': 'stock_code',
-                    '名称': 'stock_name',
-                    '最新价': 'latest_price'
-                }
-                
-                # 根据不同周期设置相应的字段映射
-                period_prefix = indicator if indicator != "今日" else "今日"
-                
-                # 涨跌幅字段
-                if f'{period_prefix}涨跌幅' in df.columns:
-                    column_mapping[f'{period_prefix}涨跌幅'] = 'pct_chg'
-                elif '今日涨跌幅' in df.columns:
-                    column_mapping['今日涨跌幅'] = 'pct_chg'
-                
-                # 资金流向字段映射
-                fund_flow_mappings = [
-                    (f'{period_prefix}主力净流入-净额', 'main_net_inflow_amount'),
-                    (f'{period_prefix}主力净流入-净占比', 'main_net_inflow_rate'),
-                    (f'{period_prefix}超大单净流入-净额', 'super_large_net_amount'),
-                    (f'{period_prefix}超大单净流入-净占比', 'super_large_net_rate'),
-                    (f'{period_prefix}大单净流入-净额', 'large_net_amount'),
-                    (f'{period_prefix}大单净流入-净占比', 'large_net_rate'),
-                    (f'{period_prefix}中单净流入-净额', 'medium_net_amount'),
-                    (f'{period_prefix}中单净流入-净占比', 'medium_net_rate'),
-                    (f'{period_prefix}小单净流入-净额', 'small_net_amount'),
-                    (f'{period_prefix}小单净流入-净占比', 'small_net_rate')
-                ]
-                
-                for old_col, new_col in fund_flow_mappings:
-                    if old_col in df.columns:
-                        column_mapping[old_col] = new_col
-                
-                # 重命名列
-                df = df.rename(columns=column_mapping)
-                
-                # 添加周期指标和交易日期
-                df['indicator'] = indicator
-                df['trade_date'] = today
-                df['update_time'] = datetime.now()
-                
-                # 数据类型转换
-                numeric_fields = ['rank', 'latest_price', 'pct_chg', 'main_net_inflow_amount', 
-                                'main_net_inflow_rate', 'super_large_net_amount', 'super_large_net_rate',
-                                'large_net_amount', 'large_net_rate', 'medium_net_amount', 'medium_net_rate',
-                                'small_net_amount', 'small_net_rate']
-                
-                for field in numeric_fields:
-                    if field in df.columns:
-                        df[field] = pd.to_numeric(df[field], errors='coerce')
-                
-                # 清理数据
-                df = self.clean_dataframe(df)
-                
-                # 移除关键字段为空的行
-                df = df.dropna(subset=['stock_code', 'stock_name'])
-                
-                # 过滤掉在stock_basic表中不存在的股票代码，避免外键约束错误
-                from database import db
-                valid_stocks = db.get_stock_list()
-                before_count = len(df)
-                df_filtered = df[df['stock_code'].isin(valid_stocks)].copy()
-                after_count = len(df_filtered)
-                
-                if before_count > after_count:
-                    logger.info(f"过滤掉 {before_count - after_count} 只不在基础表中的股票")
-                    logger.info(f"剩余有效股票数据: {after_count} 条")
-                
-                df = pd.DataFrame(df_filtered)
-                
-                # 数据去重 - 按唯一约束字段去重，保留第一条记录
-                unique_fields = ['stock_code', 'indicator', 'trade_date']
-                before_dedup_count = len(df)
-                df = df.drop_duplicates(subset=unique_fields, keep='first')
-                after_dedup_count = len(df)
-                
-                if before_dedup_count > after_dedup_count:
-                    logger.info(f"数据去重: 删除 {before_dedup_count - after_dedup_count} 条重复记录")
-                    logger.info(f"去重后剩余数据: {after_dedup_count} 条")
-                
-                logger.info(f"准备插入 {len(df)} 条 {indicator} 个股资金流排名数据")
-                logger.info(f"数据列: {df.columns.tolist()}")
-                
-                # 插入数据库
-                success = db.upsert_dataframe(
-                    df,
-                    'stock_fund_flow_rank',
-                    ['stock_code', 'indicator', 'trade_date']
-                )
-                
-                if success:
-                    logger.info(f"✅ 成功采集 {indicator} 个股资金流排名数据 {len(df)} 条")
-                else:
-                    overall_success = False
-                    logger.error(f"❌ {indicator} 个股资金流排名数据插入失败")
-                
-                # 延时控制
-                self.smart_delay()
-                
-            except Exception as e:
-                logger.error(f"❌ 采集 {indicator} 个股资金流排名数据失败: {e}")
-                overall_success = False
+        # 基础表中的股票代码，用于过滤外键约束错误，所有周期共用一次查询
+        valid_stocks = db.get_stock_list()
+        
+        with ThreadPoolExecutor(max_workers=max(len(indicators), 1)) as executor:
+            futures = [
+                executor.submit(self._collect_one_indicator, indicator, valid_stocks, now)
+                for indicator in indicators
+            ]
+            overall_success = all([future.result() for future in futures])
         
         if overall_success:
             logger.info("✅ 个股资金流排名数据采集完成")
@@ -1033,6 +1226,84 @@ class StockFundFlowRankCollector(BaseCollector):
             logger.warning("⚠️ 个股资金流排名数据部分采集失败")
         
         return overall_success
+    
+    def _collect_one_indicator(self, indicator: str, valid_stocks: Tuple[str, ...], now: datetime) -> bool:
+        """采集单个周期的个股资金流排名数据"""
+        logger.info(f"采集 {indicator} 资金流排名数据...")
+        today = now.date()
+        
+        try:
+            # 获取指定周期的个股资金流排名
+            df = self.safe_request(ak.stock_individual_fund_flow_rank, indicator=indicator)
+            
+            if df.empty:
+                logger.warning(f"{indicator} 个股资金流排名数据为空")
+                return False
+            
+            logger.info(f"获取到 {len(df)} 条 {indicator} 个股资金流排名数据")
+            
+            # 字段映射 - 基础字段 + 对应周期的资金流字段
+            period_mapping = FUND_FLOW_PERIOD_MAPPINGS.get(indicator) or {
+                f'{indicator}{suffix}': field for suffix, field in FUND_FLOW_FIELD_SUFFIXES.items()
+            }
+            column_mapping = {**self.COLUMN_MAPPING, **period_mapping}
+            
+            # 涨跌幅字段缺失时使用今日涨跌幅
+            if f'{indicator}涨跌幅' not in df.columns and '今日涨跌幅' in df.columns:
+                column_mapping['今日涨跌幅'] = 'pct_chg'
+            
+            # 重命名列
+            df.rename(columns=column_mapping, inplace=True)
+            
+            # 添加周期指标和交易日期
+            df['indicator'] = indicator
+            df['trade_date'] = today
+            df['update_time'] = now
+            
+            # 数据类型转换
+            numeric_fields = ['rank', 'latest_price', 'pct_chg', 'main_net_inflow_amount', 
+                            'main_net_inflow_rate', 'super_large_net_amount', 'super_large_net_rate',
+                            'large_net_amount', 'large_net_rate', 'medium_net_amount', 'medium_net_rate',
+                            'small_net_amount', 'small_net_rate']
+            numeric_fields = df.columns.intersection(numeric_fields, sort=False)
+            df[numeric_fields] = df[numeric_fields].apply(pd.to_numeric, errors='coerce')
+            
+            # 清理数据
+            df = self.clean_dataframe(df)
+            
+            # 移除关键字段为空的行
+            df = df.dropna(subset=['stock_code', 'stock_name'])
+            
+            # 过滤掉在stock_basic表中不存在的股票代码（避免外键约束错误），并按唯一约束字段去重
+            before_count = len(df)
+            df = df[df['stock_code'].isin(valid_stocks)].drop_duplicates(
+                subset=['stock_code', 'indicator', 'trade_date'], keep='first', ignore_index=True
+            )
+            logger.opt(lazy=True).debug(
+                "过滤无效股票及重复记录 {} 条，剩余 {} 条", lambda: before_count - len(df), lambda: len(df)
+            )
+            
+            logger.info(f"准备插入 {len(df)} 条 {indicator} 个股资金流排名数据")
+            logger.opt(lazy=True).debug("数据列: {}", lambda: df.columns.tolist())
+            
+            # 插入数据库
+            success = db.upsert_dataframe(
+                df,
+                'stock_fund_flow_rank',
+                ['stock_code', 'indicator', 'trade_date'],
+                method='copy'
+            )
+            
+            if success:
+                logger.info(f"✅ 成功采集 {indicator} 个股资金流排名数据 {len(df)} 条")
+            else:
+                logger.error(f"❌ {indicator} 个股资金流排名数据插入失败")
+            
+            return success
+            
+        except Exception as e:
+            logger.error(f"❌ 采集 {indicator} 个股资金流排名数据失败: {e}")
+            return False
 
 
 class StockNewsCollector(BaseCollector):
@@ -1040,16 +1311,16 @@ class StockNewsCollector(BaseCollector):
     
     def __init__(self):
         super().__init__()
-        # 设置适合新闻采集的延时配置
-        self.set_delay_config(
-            base_delay=0.1,      # 基础延时0.1秒（更快）
-            random_delay=0.2,    # 随机延时最多0.2秒
-            batch_delay=2.0,     # 批次延时2秒
-            batch_size=50        # 每50条处理一批
-        )
+        # 新闻统计缓存 (缓存时间, 统计结果)，有效期为一个新闻采集周期，采集入库后失效
+        self.stats_cache_ttl = config.NEWS_COLLECTION_INTERVAL * 60
+        self._stats_cache: Optional[tuple] = None
     
-    def collect_news(self, max_process_count: int = 10) -> bool:
-        """采集东方财富全球财经快讯"""
+    def collect_news(self, max_process_count: int = 10) -> Tuple[bool, int, int]:
+        """采集东方财富全球财经快讯
+        
+        Returns:
+            (是否成功, 新增新闻条数, 已存在的重复新闻条数)
+        """
         logger.info("开始采集东方财富全球财经快讯...")
         
         try:
@@ -1059,7 +1330,7 @@ class StockNewsCollector(BaseCollector):
             
             if news_df.empty:
                 logger.warning("东方财富新闻数据为空")
-                return False
+                return False, 0, 0
             
             original_count = len(news_df)
             logger.info(f"获取到 {original_count} 条新闻数据")
@@ -1069,143 +1340,98 @@ class StockNewsCollector(BaseCollector):
                 news_df = news_df.head(max_process_count)
                 logger.info(f"限制处理数量，只处理最新的 {max_process_count} 条新闻")
             
-            # 数据清理和转换
-            news_df = self.clean_dataframe(news_df)
-            
-            # 字段映射和处理
-            processed_news = []
-            new_news_count = 0
-            duplicate_count = 0
-            processed_urls = set()  # 记录已处理的URL，避免批次内重复
-            
-            for idx, (index, row) in enumerate(news_df.iterrows()):
-                try:
-                    # 提取基础数据（新接口字段：标题、摘要、发布时间、链接）
-                    url = str(row.get('链接', '')).strip()
-                    if not url:
-                        continue
-                    
-                    # 检查批次内是否重复
-                    if url in processed_urls:
-                        duplicate_count += 1
-                        continue
-                    
-                    # 快速检查数据库中是否已存在
-                    try:
-                        existing_check = db.supabase.table('stock_news').select('id').eq('url', url).limit(1).execute()
-                        if existing_check.data:
-                            duplicate_count += 1
-                            # 每100个重复新闻输出一次进度
-                            if duplicate_count % 100 == 0:
-                                logger.info(f"已跳过 {duplicate_count} 条重复新闻...")
-                            continue
-                    except:
-                        pass  # 检查失败就继续处理
-                    
-                    # 记录URL到已处理集合
-                    processed_urls.add(url)
-                    
-                    # 准备数据（字段映射：标题->tag, 摘要->summary, 发布时间->pub_time等）
-                    title_value = row.get('标题')
-                    summary_value = row.get('摘要')
-                    pub_time_value = row.get('发布时间')
-                    
-                    news_data = {
-                        'url': url,
-                        'tag': str(title_value)[:100] if title_value is not None and not pd.isna(title_value) else None,
-                        'summary': str(summary_value) if summary_value is not None and not pd.isna(summary_value) else None,
-                        'pub_time': str(pub_time_value)[:50] if pub_time_value is not None and not pd.isna(pub_time_value) else None,
-                        'pub_date_time': self._parse_pub_time(pub_time_value),
-                        'create_time': datetime.now(),
-                        'update_time': datetime.now()
-                    }
-                    
-                    processed_news.append(news_data)
-                    new_news_count += 1
-                    
-                    # 每50条新新闻输出一次进度
-                    if new_news_count % 50 == 0:
-                        logger.info(f"已处理 {new_news_count} 条新新闻，跳过 {duplicate_count} 条重复新闻")
-                    
-                    # 如果连续100条都是重复的，提前结束
-                    if duplicate_count > 100 and new_news_count == 0:
-                        logger.info("连续发现大量重复新闻，提前结束采集")
-                        break
-                    
-                    # 智能延时控制 - 减少延时频率
-                    if idx % 10 == 0:  # 每10条延时一次
-                        self.smart_delay(idx // 10)
-                    
-                except Exception as e:
-                    logger.warning(f"处理第 {idx} 条新闻失败: {e}")
-                    continue
+            # 数据清理和转换（新接口字段：标题、摘要、发布时间、链接）
+            news_df = self.clean_dataframe(news_df).reindex(columns=['标题', '摘要', '发布时间', '链接'])
+            now = datetime.now()
             
-            if not processed_news:
-                logger.warning("没有有效的新闻数据")
-                return False
+            # 过滤空链接并在批次内按URL去重
+            news_df['url'] = news_df['链接'].astype(STRING_DTYPE).str.strip()
+            news_df = news_df[news_df['url'].fillna('').str.len() > 0]
+            valid_count = len(news_df)
+            news_df = news_df.drop_duplicates(subset=['url'], keep='first')
+            duplicate_count = valid_count - len(news_df)
             
-            # 转换为DataFrame
-            news_insert_df = pd.DataFrame(processed_news)
+            if duplicate_count > 0:
+                logger.info(f"跳过 {duplicate_count} 条批次内重复新闻")
+            
+            if news_df.empty:
+                logger.warning("没有有效的新闻数据")
+                return False, 0, 0
+            
+            # 字段映射：标题->tag, 摘要->summary, 发布时间->pub_time等
+            news_insert_df = pd.DataFrame({
+                'url': news_df['url'],
+                'tag': news_df['标题'].astype(STRING_DTYPE).str.slice(0, 100),
+                'summary': news_df['摘要'].astype(STRING_DTYPE),
+                'pub_time': news_df['发布时间'].astype(STRING_DTYPE).str.slice(0, 50),
+                'pub_date_time': self._parse_pub_times(news_df['发布时间']),
+                'update_time': now
+            })
             
             logger.info(f"准备插入 {len(news_insert_df)} 条新闻数据")
             
-            # 插入数据库（基于URL去重）
+            # 统计新增/重复条数：按 url 额外查询一次本批次中已入库的新闻（upsert 结果无法区分新增与更新），
+            # 只涉及本批次几条记录，走 url 唯一索引
+            existing_count = self._count_existing_news(news_insert_df['url'].tolist())
+            new_count = len(news_insert_df) - existing_count
+            
+            # 插入数据库（url 唯一约束，已存在的新闻由 upsert 在服务端去重；
+            # create_time 不写入，新增时使用数据库默认值，已存在的新闻保留首次采集时间）
             success = db.upsert_dataframe(
                 news_insert_df,
                 'stock_news',
                 ['url']  # 使用URL作为唯一标识
             )
             
-            if success:
-                logger.info(f"成功采集东方财富全球财经快讯 {len(news_insert_df)} 条")
-                
-                # 清理超过一周的旧新闻
-                self._cleanup_old_news()
+            if not success:
+                return False, 0, 0
             
-            return success
+            self.invalidate_stats_cache()
+            logger.info(f"成功采集东方财富全球财经快讯 {len(news_insert_df)} 条，其中新增 {new_count} 条")
+            
+            # 清理超过一周的旧新闻
+            self._cleanup_old_news()
+            
+            return True, new_count, existing_count
             
         except Exception as e:
             logger.error(f"采集东方财富全球财经快讯失败: {e}")
-            return False
+            return False, 0, 0
     
-    def _parse_pub_time(self, pub_time_str) -> Optional[datetime]:
-        """解析发布时间字符串为datetime对象"""
-        if not pub_time_str or pd.isna(pub_time_str):
-            return None
-            
+    @staticmethod
+    def _count_existing_news(urls: List[str]) -> int:
+        """统计给定 url 中已存在于数据库的新闻条数，查询失败时按 0 处理"""
         try:
-            import re
-            pub_time_str = str(pub_time_str).strip()
-            
-            # 格式1: YYYY-MM-DD HH:MM:SS.mmm (带毫秒)
-            if re.match(r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d+', pub_time_str):
-                # 移除毫秒部分
-                base_time = re.sub(r'\.\d+$', '', pub_time_str)
-                return datetime.strptime(base_time, '%Y-%m-%d %H:%M:%S')
-            
-            # 格式2: YYYY-MM-DD HH:MM:SS (不带毫秒)
-            elif re.match(r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$', pub_time_str):
-                return datetime.strptime(pub_time_str, '%Y-%m-%d %H:%M:%S')
-            
-            # 格式3: YYYY-MM-DD
-            elif re.match(r'\d{4}-\d{2}-\d{2}$', pub_time_str):
-                return datetime.strptime(pub_time_str, '%Y-%m-%d')
-            
-            # 格式4: MM月DD日
-            elif '月' in pub_time_str and '日' in pub_time_str:
-                month_match = re.search(r'(\d+)月', pub_time_str)
-                day_match = re.search(r'(\d+)日', pub_time_str)
-                if month_match and day_match:
-                    current_year = datetime.now().year
-                    month = int(month_match.group(1))
-                    day = int(day_match.group(1))
-                    return datetime(current_year, month, day)
-            
-            return None
-            
+            result = db.supabase.table('stock_news').select('url').in_('url', urls).execute()
+            return len(result.data or [])
         except Exception as e:
-            logger.warning(f"解析时间失败: {pub_time_str}, 错误: {e}")
-            return None
+            logger.warning(f"查询已存在新闻失败: {e}")
+            return 0
+    
+    @staticmethod
+    def _parse_pub_times(pub_times: pd.Series) -> pd.Series:
+        """批量解析发布时间为datetime，无法解析的为 NaT
+        
+        支持 YYYY-MM-DD HH:MM:SS(.mmm)、YYYY-MM-DD 以及 MM月DD日（按当年补全）
+        """
+        text = pub_times.astype(STRING_DTYPE).str.strip()
+        
+        # ISO 格式，移除毫秒部分
+        parsed = pd.to_datetime(
+            text.str.replace(r'\.\d+$', '', regex=True), format='ISO8601', errors='coerce'
+        )
+        
+        # MM月DD日 格式，仅处理上一步未解析的行
+        missing = parsed.isna() & text.notna()
+        if missing.any():
+            parts = text[missing].str.extract(r'(\d+)月(\d+)日').astype(float)
+            fallback = pd.to_datetime(
+                pd.DataFrame({'year': datetime.now().year, 'month': parts[0], 'day': parts[1]}),
+                errors='coerce'
+            )
+            parsed = parsed.fillna(fallback)
+        
+        return parsed
     
     def _cleanup_old_news(self):
         """清理超过一周的旧新闻"""
@@ -1213,13 +1439,13 @@ class StockNewsCollector(BaseCollector):
             one_week_ago = datetime.now() - timedelta(days=7)
             one_week_ago_str = one_week_ago.isoformat()
             
-            # 查询要删除的记录数量
-            old_news = db.supabase.table('stock_news').select('id').lt('create_time', one_week_ago_str).execute()
-            delete_count = len(old_news.data) if old_news.data else 0
+            # 直接删除并只由服务端返回删除数量（returning=minimal 不回传被删除的行）
+            result = (db.supabase.table('stock_news')
+                      .delete(count='exact', returning=ReturnMethod.minimal)
+                      .lt('create_time', one_week_ago_str).execute())
+            delete_count = result.count or 0
             
             if delete_count > 0:
-                # 执行删除
-                db.supabase.table('stock_news').delete().lt('create_time', one_week_ago_str).execute()
                 logger.info(f"已清理 {delete_count} 条超过一周的旧新闻")
             
         except Exception as e:
@@ -1254,14 +1480,24 @@ class StockNewsCollector(BaseCollector):
             logger.error(f"搜索新闻失败: {e}")
             return []
     
-    def get_news_stats(self) -> Dict:
-        """获取新闻统计信息"""
+    def get_news_stats(self, use_cache: bool = True) -> Dict:
+        """获取新闻统计信息
+        
+        统计结果缓存一个新闻采集周期（NEWS_COLLECTION_INTERVAL），采集入库后缓存失效；
+        use_cache=False 时强制重新统计。
+        """
+        if use_cache and self._stats_cache:
+            cached_at, cached_stats = self._stats_cache
+            if time.monotonic() - cached_at < self.stats_cache_ttl:
+                return cached_stats
+        
         try:
             # 总新闻数
             total_result = db.count_records('stock_news')
             
             # 今日新增新闻数
-            today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+            now = datetime.now()
+            today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
             today_start_str = today_start.isoformat()
             today_result = db.supabase.table('stock_news').select('id').gte('create_time', today_start_str).execute()
             today_count = len(today_result.data) if today_result.data else 0
@@ -1277,33 +1513,32 @@ class StockNewsCollector(BaseCollector):
             latest_time = latest_result.data[0]['create_time'] if latest_result.data else None
             
             # 热门标签统计（最近一周）
-            week_ago = datetime.now() - timedelta(days=7)
+            week_ago = now - timedelta(days=7)
             week_ago_str = week_ago.isoformat()
             tag_result = db.supabase.table('stock_news').select('tag').gte('create_time', week_ago_str).execute()
             
-            # 统计标签频次
-            tag_counts = {}
-            if tag_result.data:
-                for record in tag_result.data:
-                    tag = record.get('tag')
-                    if tag:
-                        tag_counts[tag] = tag_counts.get(tag, 0) + 1
+            # 统计标签频次，取前10个热门标签
+            tags = pd.Series([record.get('tag') for record in (tag_result.data or [])], dtype=object)
+            tags = tags[tags.notna() & (tags != '')]
+            hot_tags = [{'tag': tag, 'count': int(count)} for tag, count in tags.value_counts().head(10).items()]
             
-            # 取前10个热门标签
-            hot_tags = [{'tag': tag, 'count': count} for tag, count in 
-                       sorted(tag_counts.items(), key=lambda x: x[1], reverse=True)[:10]]
-            
-            return {
+            stats = {
                 'total_news': total_result,
                 'today_news': today_count,
                 'week_news': week_count,
                 'latest_update': latest_time,
                 'hot_tags': hot_tags
             }
+            self._stats_cache = (time.monotonic(), stats)
+            return stats
             
         except Exception as e:
             logger.error(f"获取新闻统计失败: {e}")
             return {}
+    
+    def invalidate_stats_cache(self):
+        """清除新闻统计缓存"""
+        self._stats_cache = None
 
 
 # 采集器实例
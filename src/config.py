@@ -26,11 +26,16 @@ class Config:
     SUPABASE_URL = os.getenv('SUPABASE_URL')
     SUPABASE_SERVICE_ROLE_KEY = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
     DATABASE_URL = os.getenv('DATABASE_URL')
+    STOCK_LIST_CACHE_TTL = int(os.getenv('STOCK_LIST_CACHE_TTL', 3600))  # 股票列表缓存秒数
+    SUPABASE_WRITE_WORKERS = int(os.getenv('SUPABASE_WRITE_WORKERS', 4))  # REST 分批写入（insert/upsert）并发数
     
     # AKShare配置
     AKSHARE_TIMEOUT = int(os.getenv('AKSHARE_TIMEOUT', 30))
     AKSHARE_RETRY_COUNT = int(os.getenv('AKSHARE_RETRY_COUNT', 3))
     AKSHARE_RATE_LIMIT = int(os.getenv('AKSHARE_RATE_LIMIT', 10))
+    AKSHARE_MAX_WORKERS = int(os.getenv('AKSHARE_MAX_WORKERS', 4))  # 历史行情并发采集线程数
+    AKSHARE_HTTP_POOL_SIZE = int(os.getenv('AKSHARE_HTTP_POOL_SIZE', 64))  # 共享连接池大小，0 表示不复用连接
+    AKSHARE_SPOT_CACHE_TTL = int(os.getenv('AKSHARE_SPOT_CACHE_TTL', 300))  # 全市场行情快照缓存秒数
     
     # 新闻采集配置
     NEWS_COLLECTION_INTERVAL = int(os.getenv('NEWS_COLLECTION_INTERVAL', 20))  # 分钟
@@ -40,27 +45,22 @@ class Config:
     # 飞书通知配置
     FEISHU_WEBHOOK_URL = os.getenv('FEISHU_WEBHOOK_URL')
     FEISHU_ENABLED = bool(FEISHU_WEBHOOK_URL)
+    FEISHU_BATCH_FLUSH_INTERVAL = int(os.getenv('FEISHU_BATCH_FLUSH_INTERVAL', 300))  # 批量通知合并发送间隔（秒）
     
     # 系统配置
     TIMEZONE = os.getenv('TIMEZONE', 'Asia/Shanghai')
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
     LOG_RETENTION_DAYS = int(os.getenv('LOG_RETENTION_DAYS', 30))
     
-    # 采集延时配置
-    DELAY_CONFIG = {
-        'base_delay': float(os.getenv('BASE_DELAY', 0.1)),
-        'random_delay': float(os.getenv('RANDOM_DELAY', 0.2)),
-        'batch_delay': float(os.getenv('BATCH_DELAY', 2.0)),
-        'batch_size': int(os.getenv('BATCH_SIZE', 50))
-    }
-    
     @classmethod
     def get_database_config(cls) -> Dict[str, Any]:
         """获取数据库配置"""
         return {
             'supabase_url': cls.SUPABASE_URL,
             'supabase_key': cls.SUPABASE_SERVICE_ROLE_KEY,
-            'database_url': cls.DATABASE_URL
+            'database_url': cls.DATABASE_URL,
+            'stock_list_cache_ttl': cls.STOCK_LIST_CACHE_TTL,
+            'write_workers': cls.SUPABASE_WRITE_WORKERS
         }
     
     @classmethod
@@ -69,7 +69,10 @@ class Config:
         return {
             'timeout': cls.AKSHARE_TIMEOUT,
             'retry_count': cls.AKSHARE_RETRY_COUNT,
-            'rate_limit': cls.AKSHARE_RATE_LIMIT
+            'rate_limit': cls.AKSHARE_RATE_LIMIT,
+            'max_workers': cls.AKSHARE_MAX_WORKERS,
+            'http_pool_size': cls.AKSHARE_HTTP_POOL_SIZE,
+            'spot_cache_ttl': cls.AKSHARE_SPOT_CACHE_TTL
         }
     
     @classmethod
@@ -86,7 +89,8 @@ class Config:
         """获取飞书配置"""
         return {
             'webhook_url': cls.FEISHU_WEBHOOK_URL,
-            'enabled': cls.FEISHU_ENABLED
+            'enabled': cls.FEISHU_ENABLED,
+            'batch_flush_interval': cls.FEISHU_BATCH_FLUSH_INTERVAL
         }
     
     @classmethod
@@ -4,18 +4,20 @@
 Supabase 数据库连接和操作模块
 """
 
-import os
-from typing import Optional, List, Dict, Any
+import io
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Optional, List, Dict, Any, Tuple
+import asyncpg
 import pandas as pd
 from loguru import logger
-from dotenv import load_dotenv
 from supabase import create_client, Client
 from datetime import datetime, date
 from config import config
 from utils import retry_with_backoff
 
-load_dotenv()
-
 
 class Database:
     """Supabase 数据库操作类"""
@@ -25,6 +27,15 @@ class Database:
         db_config = config.get_database_config()
         self.supabase_url = db_config['supabase_url']
         self.supabase_key = db_config['supabase_key']
+        # PostgreSQL 直连地址（可选），用于 REST 接口无法表达的聚合查询
+        self.database_url = db_config['database_url']
+        
+        # 股票列表进程内缓存: (获取时间, 股票代码元组)
+        self.stock_list_cache_ttl = db_config['stock_list_cache_ttl']
+        self._stock_list_cache: Optional[tuple] = None
+        
+        # REST 分批写入（insert/upsert）的并发请求数
+        self.write_workers = max(db_config['write_workers'], 1)
         
         if not self.supabase_url or not self.supabase_key:
             raise ValueError("请设置 SUPABASE_URL 和 SUPABASE_SERVICE_ROLE_KEY 环境变量")
@@ -37,39 +48,122 @@ class Database:
             logger.error(f"Supabase 连接失败: {e}")
             raise
     
+    @staticmethod
+    def _to_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """将 DataFrame 按列向量化转换为可 JSON 序列化的记录列表
+        
+        空值和空字符串转为 None，日期时间转为 ISO 格式字符串
+        """
+        columns = {}
+        for col in df.columns:
+            series = df[col]
+            if pd.api.types.is_datetime64_any_dtype(series):
+                series = series.dt.strftime('%Y-%m-%dT%H:%M:%S.%f')
+            elif series.dtype == object or isinstance(series.dtype, pd.StringDtype):
+                not_null = series.notna()
+                sample = series.iloc[not_null.argmax()] if not_null.any() else None
+                if isinstance(sample, datetime):
+                    series = pd.to_datetime(series, errors='coerce').dt.strftime('%Y-%m-%dT%H:%M:%S.%f')
+                elif isinstance(sample, date):
+                    series = pd.to_datetime(series, errors='coerce').dt.strftime('%Y-%m-%d')
+                else:
+                    series = series.mask(series.eq('').fillna(False))
+            columns[col] = series
+        
+        converted = pd.DataFrame(columns, index=df.index)
+        return converted.astype(object).where(converted.notna(), None).to_dict('records')
+    
+    @classmethod
+    def _iter_record_batches(cls, df: pd.DataFrame, batch_size: int = 1000):
+        """按批切分 DataFrame，逐批转换为记录列表，避免一次性生成全部记录
+        
+        Yields:
+            (批次序号, 记录列表)
+        """
+        for start in range(0, len(df), batch_size):
+            yield start // batch_size + 1, cls._to_records(df.iloc[start:start + batch_size])
+    
+    def _write_batches(self, df: pd.DataFrame, write_batch) -> Optional[int]:
+        """分批并发写入 DataFrame
+        
+        每批单独转换为字典列表，同时在途的批次数有上限，避免一次性生成全部记录；
+        任一批次失败后不再提交新批次，等待在途批次结束。
+        
+        Args:
+            df: 待写入数据
+            write_batch: 写入单个批次的函数 (批次序号, 记录列表) -> 是否成功
+        
+        Returns:
+            成功写入的记录数，有批次失败时返回 None
+        """
+        max_in_flight = self.write_workers * 2
+        batches = self._iter_record_batches(df)
+        total_written = 0
+        failed = False
+        
+        with ThreadPoolExecutor(max_workers=self.write_workers) as executor:
+            pending = {}
+            while True:
+                while not failed and len(pending) < max_in_flight:
+                    item = next(batches, None)
+                    if item is None:
+                        break
+                    batch_no, batch = item
+                    pending[executor.submit(write_batch, batch_no, batch)] = len(batch)
+                
+                if not pending:
+                    break
+                
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    batch_count = pending.pop(future)
+                    if future.result():
+                        total_written += batch_count
+                    else:
+                        failed = True
+        
+        return None if failed else total_written
+    
+    def _insert_batch(self, table_name: str, batch_no: int, batch: List[Dict[str, Any]]) -> bool:
+        """通过 Supabase REST 接口插入单个批次"""
+        try:
+            self.supabase.table(table_name).insert(batch).execute()
+            logger.info(f"成功插入批次 {batch_no}: {len(batch)} 条记录")
+            return True
+        except Exception as e:
+            logger.error(f"插入批次 {batch_no} 失败: {e}")
+            return False
+    
     def insert_dataframe(self, df: pd.DataFrame, table_name: str, 
                         if_exists: str = 'append', method: str = 'multi') -> bool:
-        """将DataFrame插入Supabase表"""
+        """将DataFrame插入Supabase表
+        
+        Args:
+            df: 待写入数据
+            table_name: 目标表名
+            method: 'multi' 通过 Supabase REST 分批插入；
+                    'copy' 通过 DATABASE_URL 直连 COPY 到目标表，适合大批量追加，
+                    未配置直连或失败时回退到 REST
+        """
         try:
             if df.empty:
                 logger.warning(f"数据为空，跳过插入到 {table_name}")
                 return True
             
-            # 将 DataFrame 转换为字典列表，处理 NaN 值
-            records = df.fillna('').to_dict('records')
-            
-            # 清理数据：将空字符串转换为 None
-            for record in records:
-                for key, value in record.items():
-                    if value == '' or pd.isna(value):
-                        record[key] = None
-            
-            # 分批插入以避免请求过大
-            batch_size = 1000
-            total_inserted = 0
-            
-            for i in range(0, len(records), batch_size):
-                batch = records[i:i + batch_size]
-                
+            if method == 'copy' and self.database_url:
                 try:
-                    result = self.supabase.table(table_name).insert(batch).execute()
-                    
-                    total_inserted += len(batch)
-                    logger.info(f"成功插入批次 {i//batch_size + 1}: {len(batch)} 条记录")
-                    
+                    self._copy_insert(df, table_name)
+                    logger.info(f"成功 COPY 插入 {len(df)} 条记录到 {table_name} 表")
+                    return True
                 except Exception as e:
-                    logger.error(f"插入批次 {i//batch_size + 1} 失败: {e}")
-                    return False
+                    logger.warning(f"COPY 插入到 {table_name} 失败，回退到 REST 接口: {e}")
+            
+            # 分批并发插入以避免请求过大
+            total_inserted = self._write_batches(
+                df, lambda batch_no, batch: self._insert_batch(table_name, batch_no, batch)
+            )
+            if total_inserted is None:
+                return False
             
             logger.info(f"成功插入 {total_inserted} 条记录到 {table_name} 表")
             return True
@@ -80,46 +174,37 @@ class Database:
     
     @retry_with_backoff(max_retries=3, delay=1.0)
     def upsert_dataframe(self, df: pd.DataFrame, table_name: str, 
-                        conflict_columns: List[str]) -> bool:
-        """使用 Supabase upsert 进行数据插入或更新"""
+                        conflict_columns: List[str], method: str = 'rest') -> bool:
+        """使用 Supabase upsert 进行数据插入或更新
+        
+        Args:
+            df: 待写入数据
+            table_name: 目标表名
+            conflict_columns: 唯一约束字段
+            method: 'rest' 通过 Supabase REST 分批 upsert；
+                    'copy' 通过 DATABASE_URL 直连，COPY 到临时表后执行一次 INSERT ... ON CONFLICT，
+                    适合大批量写入，未配置直连或失败时回退到 REST
+        """
         try:
             if df.empty:
                 logger.warning(f"数据为空，跳过 upsert 到 {table_name}")
                 return True
             
-            # 将 DataFrame 转换为字典列表，处理 NaN 值
-            records = df.fillna('').to_dict('records')
-            
-            # 清理数据：将空字符串转换为 None，处理日期时间类型
-            for record in records:
-                for key, value in record.items():
-                    if value == '' or pd.isna(value):
-                        record[key] = None
-                    elif isinstance(value, (pd.Timestamp, datetime)):
-                        record[key] = value.isoformat()
-                    elif isinstance(value, date):
-                        record[key] = value.isoformat()
-            
-            # 分批处理
-            batch_size = 1000
-            total_upserted = 0
-            
-            for i in range(0, len(records), batch_size):
-                batch = records[i:i + batch_size]
-                
+            if method == 'copy' and self.database_url:
                 try:
-                    # Supabase 的 upsert 方法
-                    result = self.supabase.table(table_name).upsert(
-                        batch, 
-                        on_conflict=','.join(conflict_columns)
-                    ).execute()
-                    
-                    total_upserted += len(batch)
-                    logger.info(f"成功 upsert 批次 {i//batch_size + 1}: {len(batch)} 条记录")
-                    
+                    self._copy_upsert(df, table_name, conflict_columns)
+                    logger.info(f"成功 COPY upsert {len(df)} 条记录到 {table_name} 表")
+                    return True
                 except Exception as e:
-                    logger.error(f"Upsert 批次 {i//batch_size + 1} 失败: {e}")
-                    return False
+                    logger.warning(f"COPY upsert 到 {table_name} 失败，回退到 REST 接口: {e}")
+            
+            # 分批并发处理
+            on_conflict = ','.join(conflict_columns)
+            total_upserted = self._write_batches(
+                df, lambda batch_no, batch: self._upsert_batch(table_name, batch_no, batch, on_conflict)
+            )
+            if total_upserted is None:
+                return False
             
             logger.info(f"成功 upsert {total_upserted} 条记录到 {table_name} 表")
             return True
@@ -128,6 +213,17 @@ class Database:
             logger.error(f"Upsert 数据失败: {e}")
             return False
     
+    def _upsert_batch(self, table_name: str, batch_no: int, batch: List[Dict[str, Any]],
+                      on_conflict: str) -> bool:
+        """通过 Supabase REST 接口 upsert 单个批次"""
+        try:
+            self.supabase.table(table_name).upsert(batch, on_conflict=on_conflict).execute()
+            logger.info(f"成功 upsert 批次 {batch_no}: {len(batch)} 条记录")
+            return True
+        except Exception as e:
+            logger.error(f"Upsert 批次 {batch_no} 失败: {e}")
+            return False
+    
     def get_latest_date(self, table_name: str, date_column: str, 
                        stock_code: Optional[str] = None) -> Optional[str]:
         """获取表中最新的日期"""
@@ -148,10 +244,8 @@ class Database:
                     if isinstance(date_value, str):
                         if len(date_value) == 8:  # YYYYMMDD
                             return date_value
-                        else:  # YYYY-MM-DD 或其他格式
-                            from datetime import datetime
-                            dt = datetime.strptime(date_value.split('T')[0], '%Y-%m-%d')
-                            return dt.strftime('%Y%m%d')
+                        else:  # YYYY-MM-DD 或 YYYY-MM-DDTHH:MM:SS 等 ISO 格式
+                            return date.fromisoformat(date_value[:10]).strftime('%Y%m%d')
                     else:
                         return date_value.strftime('%Y%m%d')
             
@@ -161,18 +255,148 @@ class Database:
             logger.error(f"获取最新日期失败: {e}")
             return None
     
-    def get_stock_list(self) -> List[str]:
-        """获取所有股票代码列表"""
+    def get_latest_dates(self, table_name: str, date_column: str,
+                         key_column: str = 'stock_code') -> Optional[Dict[str, str]]:
+        """一次查询获取每个代码的最新日期
+        
+        优先通过 DATABASE_URL 直连 PostgreSQL 执行 GROUP BY 聚合；未配置直连时调用
+        数据库函数 get_latest_dates（见 docs/项目详细说明.md），
+        替代逐个代码调用 get_latest_date 的 N 次往返。
+        
+        Returns:
+            {代码: YYYYMMDD}，两种方式都不可用时返回 None（调用方应回退到逐个查询）
+        """
+        if self.database_url:
+            query = (
+                f'SELECT "{key_column}" AS key, MAX("{date_column}") AS latest '
+                f'FROM "{table_name}" GROUP BY "{key_column}"'
+            )
+            
+            try:
+                rows = self._pg_fetch(query)
+                latest_dates = {
+                    row['key']: row['latest'].strftime('%Y%m%d')
+                    for row in rows if row['latest']
+                }
+                logger.info(f"获取到 {len(latest_dates)} 个代码的最新日期")
+                return latest_dates
+                
+            except Exception as e:
+                logger.warning(f"直连批量获取最新日期失败，尝试 RPC: {e}")
+        
         try:
-            all_stocks = []
+            # 函数返回单个 JSON 对象，不受 REST 接口单次返回行数上限的影响
+            result = self.supabase.rpc('get_latest_dates', {
+                'p_table': table_name,
+                'p_date_col': date_column,
+                'p_key_col': key_column
+            }).execute()
+            latest_dates = result.data or {}
+            logger.info(f"获取到 {len(latest_dates)} 个代码的最新日期")
+            return latest_dates
+            
+        except Exception as e:
+            logger.warning(f"批量获取最新日期失败，将回退到逐个查询: {e}")
+            return None
+    
+    def _copy_upsert(self, df: pd.DataFrame, table_name: str, 
+                     conflict_columns: List[str]) -> None:
+        """COPY 数据到临时表，再合并到目标表（INSERT ... ON CONFLICT DO UPDATE）"""
+        columns = list(df.columns)
+        column_list = ', '.join(f'"{col}"' for col in columns)
+        conflict_list = ', '.join(f'"{col}"' for col in conflict_columns)
+        update_columns = [col for col in columns if col not in conflict_columns]
+        
+        if update_columns:
+            conflict_action = 'DO UPDATE SET ' + ', '.join(
+                f'"{col}" = EXCLUDED."{col}"' for col in update_columns
+            )
+        else:
+            conflict_action = 'DO NOTHING'
+        
+        staging_table = f'_staging_{table_name}'
+        csv_buffer = self._to_csv_buffer(df)
+        
+        async def _upsert(conn):
+            async with conn.transaction():
+                # 临时表只包含待写入列，列类型与目标表一致
+                await conn.execute(
+                    f'CREATE TEMP TABLE "{staging_table}" ON COMMIT DROP AS '
+                    f'SELECT {column_list} FROM "{table_name}" WITH NO DATA'
+                )
+                await conn.copy_to_table(
+                    staging_table, source=csv_buffer,
+                    columns=columns, format='csv'
+                )
+                await conn.execute(
+                    f'INSERT INTO "{table_name}" ({column_list}) '
+                    f'SELECT {column_list} FROM "{staging_table}" '
+                    f'ON CONFLICT ({conflict_list}) {conflict_action}'
+                )
+        
+        self._pg_run(_upsert)
+    
+    def _copy_insert(self, df: pd.DataFrame, table_name: str) -> None:
+        """COPY 数据直接追加到目标表（无冲突处理）"""
+        columns = list(df.columns)
+        csv_buffer = self._to_csv_buffer(df)
+        
+        self._pg_run(lambda conn: conn.copy_to_table(
+            table_name, source=csv_buffer, columns=columns, format='csv'
+        ))
+    
+    @staticmethod
+    def _to_csv_buffer(df: pd.DataFrame) -> io.BytesIO:
+        """将 DataFrame 写为 COPY 使用的 CSV 字节缓冲区
+        
+        CSV 中未加引号的空字段即为 NULL，由 PostgreSQL 按目标列类型解析；
+        直接写入字节缓冲区，避免先生成完整字符串再编码的额外拷贝
+        """
+        csv_buffer = io.BytesIO()
+        df.to_csv(csv_buffer, index=False, header=False, encoding='utf-8')
+        csv_buffer.seek(0)
+        return csv_buffer
+    
+    def _pg_fetch(self, query: str, *args) -> List[Any]:
+        """通过 DATABASE_URL 直连 PostgreSQL 执行查询"""
+        return self._pg_run(lambda conn: conn.fetch(query, *args))
+    
+    def _pg_run(self, operation) -> Any:
+        """建立 PostgreSQL 直连并执行 operation(conn) 协程"""
+        async def _run():
+            # Supabase 连接池为事务模式，需关闭预编译语句缓存
+            conn = await asyncpg.connect(self.database_url, statement_cache_size=0)
+            try:
+                return await operation(conn)
+            finally:
+                await conn.close()
+        
+        return asyncio.run(_run())
+    
+    def get_stock_list(self, use_cache: bool = True) -> Tuple[str, ...]:
+        """获取所有股票代码（按代码升序）
+        
+        返回不可变元组，既可按序遍历、random.sample 抽样，也可直接用于 isin 过滤，缓存命中时无需复制。
+        结果在进程内缓存 STOCK_LIST_CACHE_TTL 秒，股票基础信息更新后应调用
+        invalidate_stock_list_cache 使缓存失效。
+        """
+        if use_cache and self._stock_list_cache:
+            cached_at, cached_stocks = self._stock_list_cache
+            if time.monotonic() - cached_at < self.stock_list_cache_ttl:
+                return cached_stocks
+        
+        try:
+            all_stocks: List[str] = []
             page_size = 1000
-            offset = 0
+            page_no = 0
+            last_code = ''
             
             logger.info("开始分页获取股票列表...")
             
             while True:
-                # 分页查询股票代码
-                result = self.supabase.table('stock_basic').select('stock_code').range(offset, offset + page_size - 1).execute()
+                # 按 stock_code 游标分页（主键索引定位），避免 OFFSET 重复扫描之前的行
+                result = (self.supabase.table('stock_basic').select('stock_code')
+                          .gt('stock_code', last_code).order('stock_code').limit(page_size).execute())
                 
                 if not result.data:
                     break
@@ -180,31 +404,43 @@ class Database:
                 # 提取股票代码
                 page_stocks = [row['stock_code'] for row in result.data if row.get('stock_code')]
                 all_stocks.extend(page_stocks)
+                page_no += 1
                 
-                logger.info(f"获取第 {offset//page_size + 1} 页: {len(page_stocks)} 只股票")
+                logger.info(f"获取第 {page_no} 页: {len(page_stocks)} 只股票")
                 
                 # 如果这一页的数据少于page_size，说明已经到最后一页了
                 if len(result.data) < page_size:
                     break
                 
-                offset += page_size
+                last_code = result.data[-1]['stock_code']
             
             logger.info(f"总共获取到 {len(all_stocks)} 只股票代码")
+            all_stocks = tuple(all_stocks)
+            if all_stocks:
+                self._stock_list_cache = (time.monotonic(), all_stocks)
             return all_stocks
             
         except Exception as e:
             logger.error(f"获取股票列表失败: {e}")
-            return []
+            return ()
+    
+    def invalidate_stock_list_cache(self):
+        """清除股票列表缓存"""
+        self._stock_list_cache = None
     
     def check_table_exists(self, table_name: str) -> bool:
         """检查表是否存在"""
         try:
-            # 尝试查询表，如果失败则表不存在
-            result = self.supabase.table(table_name).select('*').limit(1).execute()
+            # HEAD 请求只返回响应头，不传输任何行数据
+            self.supabase.table(table_name).select('*', head=True).limit(1).execute()
             return True
             
         except Exception as e:
-            logger.warning(f"表 {table_name} 不存在或无法访问: {e}")
+            # 区分表不存在与网络等其他错误，便于排查
+            if getattr(e, 'code', None) in ('42P01', 'PGRST205'):
+                logger.warning(f"表 {table_name} 不存在: {e}")
+            else:
+                logger.warning(f"表 {table_name} 无法访问: {e}")
             return False
     
     def execute_query(self, table_name: str, select_columns: str = '*', 
@@ -241,44 +477,61 @@ class Database:
             logger.error(f"查询执行失败: {e}")
             return []
     
-    def count_records(self, table_name: str, filters: Optional[Dict] = None) -> int:
-        """统计记录数量"""
+    def count_records(self, table_name: str, filters: Optional[Dict] = None,
+                      count: str = 'exact') -> int:
+        """统计记录数量
+        
+        使用 HEAD 请求由服务端返回计数，不下载任何记录。
+        
+        Args:
+            table_name: 表名
+            filters: 等值过滤条件
+            count: 'exact' 精确计数；'estimated' 使用统计信息估算，大表上更快
+        """
         try:
-            total_count = 0
-            page_size = 1000
-            offset = 0
+            query_builder = self.supabase.table(table_name).select('*', count=count, head=True)
             
-            while True:
-                # 分页查询
-                query_builder = self.supabase.table(table_name).select('id')
-                
-                # 添加过滤条件
-                if filters:
-                    for key, value in filters.items():
-                        query_builder = query_builder.eq(key, value)
-                
-                # 分页范围
-                result = query_builder.range(offset, offset + page_size - 1).execute()
-                
-                if not result.data:
-                    break
-                
-                total_count += len(result.data)
-                
-                # 如果这一页数据少于page_size，说明到最后一页了
-                if len(result.data) < page_size:
-                    break
-                
-                offset += page_size
+            # 添加过滤条件
+            if filters:
+                for key, value in filters.items():
+                    query_builder = query_builder.eq(key, value)
             
-            return total_count
+            result = query_builder.execute()
+            return result.count or 0
             
         except Exception as e:
             logger.error(f"统计记录数量失败: {e}")
             return 0
 
 
-# 全局数据库实例
+_db_instance: Optional[Database] = None
+_db_lock = threading.Lock()
+
+
+def get_db() -> Database:
+    """获取全局数据库实例（首次调用时创建 Supabase 客户端）
+    
+    并发采集任务可能同时首次访问 db，加锁保证只创建一个实例（股票列表缓存等状态全局共享）
+    """
+    global _db_instance
+    
+    if _db_instance is None:
+        with _db_lock:
+            if _db_instance is None:
+                _db_instance = Database()
+    return _db_instance
+
+
+class _LazyDatabase:
+    """全局数据库实例的延迟代理，首次访问属性时才创建 Database
+    
+    导入模块本身不再建立连接，不访问数据库的命令（如 --help、system config）无需配置凭据。
+    """
+    
+    def __getattr__(self, name):
+        return getattr(get_db(), name)
 
 
-db = Database() 
\ No newline at end of file
+# 全局数据库实例
+db = _LazyDatabase()
+ 
\ No newline at end of file
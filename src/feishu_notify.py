@@ -5,16 +5,31 @@
 用于A股数据采集任务完成后的状态通知
 """
 
+import atexit
 import json
 import os
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from loguru import logger
 from config import config
 from utils import retry_with_backoff
 
 
+def _div(content: str) -> Dict[str, Any]:
+    """生成卡片中的 lark_md 文本块"""
+    return {
+        "tag": "div",
+        "text": {
+            "content": content,
+            "tag": "lark_md"
+        }
+    }
+
+
 class FeishuNotifier:
     """飞书消息推送器"""
     
@@ -27,6 +42,22 @@ class FeishuNotifier:
         """
         self.webhook_url = webhook_url
         self.timeout = 10  # 请求超时时间
+        
+        # 复用同一个 Session，多条通知共用长连接，避免每次重新建立 TCP + TLS 连接
+        self.session = requests.Session()
+        self.session.headers.update({'Content-Type': 'application/json'})
+        # webhook POST 不是幂等的：只重试连接失败和 429（请求未被处理），
+        # 读超时和 5xx 时服务端可能已投递消息，重试会导致重复通知
+        retry = Retry(
+            total=3,
+            read=0,
+            backoff_factor=0.3,
+            status_forcelist=[429],
+            allowed_methods=frozenset(['POST'])
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
     
     def send_text_message(self, content: str) -> bool:
         """
@@ -46,11 +77,10 @@ class FeishuNotifier:
                 }
             }
             
-            response = requests.post(
+            response = self.session.post(
                 self.webhook_url,
                 json=data,
-                timeout=self.timeout,
-                headers={'Content-Type': 'application/json'}
+                timeout=self.timeout
             )
             
             if response.status_code == 200:
@@ -81,38 +111,13 @@ class FeishuNotifier:
             bool: 发送是否成功
         """
         try:
-            # 构建卡片内容
-            elements = []
-            
-            # 添加内容项
-            for key, value in content.items():
-                if isinstance(value, dict):
-                    # 嵌套内容
-                    for sub_key, sub_value in value.items():
-                        elements.append({
-                            "tag": "div",
-                            "text": {
-                                "content": f"**{sub_key}**: {sub_value}",
-                                "tag": "lark_md"
-                            }
-                        })
-                else:
-                    elements.append({
-                        "tag": "div", 
-                        "text": {
-                            "content": f"**{key}**: {value}",
-                            "tag": "lark_md"
-                        }
-                    })
-            
-            # 添加时间戳
-            elements.append({
-                "tag": "div",
-                "text": {
-                    "content": f"**执行时间**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-                    "tag": "lark_md"
-                }
-            })
+            # 构建卡片内容：嵌套内容展开为各子项，最后添加时间戳
+            elements = [
+                _div(f"**{item_key}**: {item_value}")
+                for key, value in content.items()
+                for item_key, item_value in (value.items() if isinstance(value, dict) else [(key, value)])
+            ]
+            elements.append(_div(f"**执行时间**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"))
             
             data = {
                 "msg_type": "interactive",
@@ -128,11 +133,10 @@ class FeishuNotifier:
                 }
             }
             
-            response = requests.post(
+            response = self.session.post(
                 self.webhook_url,
                 json=data,
-                timeout=self.timeout,
-                headers={'Content-Type': 'application/json'}
+                timeout=self.timeout
             )
             
             if response.status_code == 200:
@@ -219,6 +223,96 @@ class FeishuNotifier:
         return self.send_card_message(title, content)
 
 
+class FeishuBatchNotifier:
+    """飞书批量通知器
+    
+    高频任务的通知先放入内存队列，由后台线程每隔 flush_interval 秒（或队列达到
+    max_batch_size 时）合并为一条卡片消息发送，发送耗时不再计入任务执行时间
+    """
+    
+    def __init__(self, notifier: FeishuNotifier, flush_interval: int = 300, max_batch_size: int = 20):
+        """
+        初始化批量通知器
+        
+        Args:
+            notifier: 实际发送消息的飞书推送器
+            flush_interval: 定时发送间隔（秒）
+            max_batch_size: 队列达到该条数时立即发送
+        """
+        self.notifier = notifier
+        self.flush_interval = flush_interval
+        self.max_batch_size = max_batch_size
+        self.log_queue: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._flush_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def enqueue(self, task_name: str, success: bool, details: Optional[Dict[str, Any]] = None):
+        """
+        将任务完成通知加入队列
+        
+        Args:
+            task_name: 任务名称
+            success: 任务是否成功
+            details: 任务详情
+        """
+        with self._lock:
+            self.log_queue.append({
+                'task_name': task_name,
+                'success': success,
+                'details': details or {},
+                'time': datetime.now().strftime('%H:%M:%S')
+            })
+            queue_size = len(self.log_queue)
+            
+            # 首次入队时才启动后台发送线程
+            if self._thread is None:
+                self._thread = threading.Thread(target=self.periodic_flush, name='feishu-batch-flush', daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+        
+        if queue_size >= self.max_batch_size:
+            self._flush_event.set()
+    
+    def periodic_flush(self):
+        """后台线程：定时或队列满时发送"""
+        while True:
+            self._flush_event.wait(self.flush_interval)
+            self._flush_event.clear()
+            self.flush()
+    
+    def flush(self) -> bool:
+        """
+        将队列中的通知合并为一条卡片消息发送
+        
+        Returns:
+            bool: 发送是否成功，队列为空时返回 True
+        """
+        with self._lock:
+            records, self.log_queue = self.log_queue, []
+        
+        if not records:
+            return True
+        
+        failed_count = sum(1 for record in records if not record['success'])
+        status_emoji = "✅" if failed_count == 0 else "⚠️"
+        title = f"{status_emoji} A股数据采集 - 批量通知（{len(records)}条，失败{failed_count}条）"
+        
+        content = {
+            str(i): {
+                "任务": f"{'✅' if record['success'] else '❌'} {record['task_name']}（{record['time']}）",
+                **record['details']
+            }
+            for i, record in enumerate(records)
+        }
+        
+        try:
+            return self.notifier.send_card_message(title, content)
+        except Exception as e:
+            logger.error(f"发送飞书批量通知异常: {e}")
+            return False
+
+
 # 全局飞书通知器实例
 # 从环境变量读取webhook URL，必须设置环境变量
 FEISHU_WEBHOOK_URL = os.getenv('FEISHU_WEBHOOK_URL')
@@ -229,6 +323,12 @@ if not FEISHU_WEBHOOK_URL:
 else:
     feishu_notifier = FeishuNotifier(FEISHU_WEBHOOK_URL)
 
+# 全局批量通知器实例，用于高频任务（如新闻采集）的通知
+feishu_batch_notifier = (
+    FeishuBatchNotifier(feishu_notifier, flush_interval=config.FEISHU_BATCH_FLUSH_INTERVAL)
+    if feishu_notifier is not None else None
+)
+
 
 def send_completion_notice(task_name: str, success: bool, details: Optional[Dict[str, Any]] = None) -> bool:
     """
@@ -248,6 +348,25 @@ def send_completion_notice(task_name: str, success: bool, details: Optional[Dict
     return feishu_notifier.notify_task_completion(task_name, success, details)
 
 
+def enqueue_completion_notice(task_name: str, success: bool, details: Optional[Dict[str, Any]] = None) -> bool:
+    """
+    将任务完成通知加入批量队列，由后台线程定时合并发送
+    
+    Args:
+        task_name: 任务名称
+        success: 是否成功
+        details: 详细信息
+        
+    Returns:
+        bool: 是否已加入队列
+    """
+    if feishu_batch_notifier is None:
+        logger.warning("飞书通知器未初始化，跳过通知发送")
+        return False
+    feishu_batch_notifier.enqueue(task_name, success, details)
+    return True
+
+
 def send_daily_summary(summary_data: Dict[str, Any]) -> bool:
     """
     快捷发送每日汇总报告
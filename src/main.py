@@ -7,9 +7,11 @@ A股数据采集主程序
 
 import argparse
 import sys
+import time
 from datetime import datetime, timedelta
 from loguru import logger
-from typing import Optional
+from typing import Optional, Callable
+from concurrent.futures import ThreadPoolExecutor
 from config import config
 from utils import setup_logger, retry_with_backoff
 from collectors import (
@@ -30,7 +32,7 @@ def setup_logging():
 
 
 def collect_historical_data(start_date: str, end_date: str = '', 
-                          enable_resume: bool = True, delay_config: Optional[dict] = None):
+                          enable_resume: bool = True, max_workers: Optional[int] = None):
     """采集历史数据"""
     logger.info("=" * 60)
     logger.info("开始采集历史数据")
@@ -41,19 +43,11 @@ def collect_historical_data(start_date: str, end_date: str = '',
     
     logger.info(f"采集时间范围: {start_date} ~ {end_date}")
     logger.info(f"断点续传: {'启用' if enable_resume else '禁用'}")
-    
-    # 配置延时参数
-    if delay_config:
-        daily_quote_collector.set_delay_config(**delay_config)
-        logger.info("已应用自定义延时配置")
-    else:
-        # 使用默认配置
-        daily_quote_collector.set_delay_config(**config.DELAY_CONFIG)
-        logger.info("已应用默认延时配置")
+    logger.info(f"请求限速: 每秒最多 {config.AKSHARE_RATE_LIMIT} 次（AKSHARE_RATE_LIMIT）")
     
     # 采集股票历史行情数据
     logger.info("\n采集股票历史行情数据...")
-    daily_quote_collector.collect_all_stocks_history(start_date, end_date, enable_resume)
+    daily_quote_collector.collect_all_stocks_history(start_date, end_date, enable_resume, max_workers)
     
     logger.info("\n" + "=" * 60)
     logger.info("历史数据采集完成")
@@ -61,9 +55,24 @@ def collect_historical_data(start_date: str, end_date: str = '',
 
 
 
+def _run_collect_task(name: str, func: Callable[[], bool]) -> bool:
+    """执行单个采集任务，记录结果并捕获异常"""
+    try:
+        success = func()
+        if success:
+            logger.info(f"✅ {name}采集成功")
+        else:
+            logger.error(f"❌ {name}采集失败")
+        return bool(success)
+    except Exception as e:
+        logger.error(f"❌ {name}采集异常: {e}")
+        return False
+
+
 def collect_today_data():
     """采集当日数据（收盘后采集当天全量数据）"""
     start_time = datetime.now()
+    start_counter = time.perf_counter()
     logger.info("=" * 60)
     logger.info("开始采集当日全量数据")
     logger.info("=" * 60)
@@ -71,83 +80,35 @@ def collect_today_data():
     today = datetime.now().strftime('%Y%m%d')
     logger.info(f"采集日期: {today}")
     
-    stock_success = False
-    index_success = False
-    hot_rank_success = False
-    hot_up_success = False
-    hsgt_success = False
-    fund_flow_rank_success = False
-    
-    # 1. 采集当日最新行情数据（批量接口）
-    logger.info("\n1. 采集当日最新行情数据...")
-    try:
-        stock_success = daily_quote_collector.collect_latest_quotes()
-        if stock_success:
-            logger.info("✅ 当日最新行情数据采集成功")
-        else:
-            logger.error("❌ 当日最新行情数据采集失败")
-    except Exception as e:
-        logger.error(f"❌ 当日最新行情数据采集异常: {e}")
-    
-    # 2. 采集当日指数数据（支持自动重试）
-    logger.info(f"\n2. 采集当日指数数据 ({today})...")
-    try:
+    # 各采集任务相互独立，并发执行（akshare 请求频率由全局限速器控制）
+    tasks = {
+        'stock': ("当日最新行情数据", daily_quote_collector.collect_latest_quotes),
         # 设置重试延迟为1小时，如果数据源未更新会自动重试
-        index_success = index_data_collector.collect_all_indexes_history(today, today, retry_delay_hours=1)
-        if index_success:
-            logger.info("✅ 当日指数数据采集成功")
-        else:
-            logger.error("❌ 当日指数数据采集失败")
-    except Exception as e:
-        logger.error(f"❌ 当日指数数据采集异常: {e}")
-    
-    # 3. 采集股票人气榜数据
-    logger.info(f"\n3. 采集股票人气榜数据 ({today})...")
-    try:
-        hot_rank_success = stock_hot_rank_collector.collect_hot_rank()
-        if hot_rank_success:
-            logger.info("✅ 股票人气榜数据采集成功")
-        else:
-            logger.error("❌ 股票人气榜数据采集失败")
-    except Exception as e:
-        logger.error(f"❌ 股票人气榜数据采集异常: {e}")
-    
-    # 4. 采集股票飙升榜数据
-    logger.info(f"\n4. 采集股票飙升榜数据 ({today})...")
-    try:
-        hot_up_success = stock_hot_up_collector.collect_hot_up()
-        if hot_up_success:
-            logger.info("✅ 股票飙升榜数据采集成功")
-        else:
-            logger.error("❌ 股票飙升榜数据采集失败")
-    except Exception as e:
-        logger.error(f"❌ 股票飙升榜数据采集异常: {e}")
+        'index': ("当日指数数据",
+                  lambda: index_data_collector.collect_all_indexes_history(today, today, retry_delay_hours=1)),
+        'hot_rank': ("股票人气榜数据", stock_hot_rank_collector.collect_hot_rank),
+        'hot_up': ("股票飙升榜数据", stock_hot_up_collector.collect_hot_up),
+        'hsgt': ("沪深港通资金流向数据", hsgt_fund_flow_collector.collect_hsgt_fund_flow),
+        # 采集全周期数据：今日、3日、5日、10日
+        'fund_flow_rank': ("个股资金流排名数据",
+                           lambda: stock_fund_flow_rank_collector.collect_fund_flow_rank(["今日", "3日", "5日", "10日"])),
+    }
     
-    # 5. 采集沪深港通资金流向数据
-    logger.info(f"\n5. 采集沪深港通资金流向数据 ({today})...")
-    try:
-        hsgt_success = hsgt_fund_flow_collector.collect_hsgt_fund_flow()
-        if hsgt_success:
-            logger.info("✅ 沪深港通资金流向数据采集成功")
-        else:
-            logger.error("❌ 沪深港通资金流向数据采集失败")
-    except Exception as e:
-        logger.error(f"❌ 沪深港通资金流向数据采集异常: {e}")
+    logger.info(f"\n并发采集 {len(tasks)} 项当日数据: {'、'.join(name for name, _ in tasks.values())}")
+    with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
+        futures = {key: executor.submit(_run_collect_task, name, func) for key, (name, func) in tasks.items()}
+    results = {key: future.result() for key, future in futures.items()}
     
-    # 6. 采集个股资金流排名数据
-    logger.info(f"\n6. 采集个股资金流排名数据 ({today})...")
-    try:
-        # 采集全周期数据：今日、3日、5日、10日
-        fund_flow_rank_success = stock_fund_flow_rank_collector.collect_fund_flow_rank(["今日", "3日", "5日", "10日"])
-        if fund_flow_rank_success:
-            logger.info("✅ 个股资金流排名数据采集成功")
-        else:
-            logger.error("❌ 个股资金流排名数据采集失败")
-    except Exception as e:
-        logger.error(f"❌ 个股资金流排名数据采集异常: {e}")
+    stock_success = results['stock']
+    index_success = results['index']
+    hot_rank_success = results['hot_rank']
+    hot_up_success = results['hot_up']
+    hsgt_success = results['hsgt']
+    fund_flow_rank_success = results['fund_flow_rank']
     
     end_time = datetime.now()
-    duration = end_time - start_time
+    # 耗时使用单调时钟计算，不受系统时间调整影响；开始/结束时间仅用于展示
+    duration = time.perf_counter() - start_counter
     overall_success = stock_success and index_success and hot_rank_success and hot_up_success and hsgt_success and fund_flow_rank_success
     
     logger.info("\n" + "=" * 60)
@@ -156,9 +117,9 @@ def collect_today_data():
     
     # 发送飞书通知
     try:
-        # 准备汇总数据
+        # 准备汇总数据（股票总数仅用于展示，使用估算计数即可）
         from database import db
-        stock_count = len(db.get_stock_list())
+        stock_count = db.count_records('stock_basic', count='estimated')
         
         success_count = (1 if stock_success else 0) + (1 if index_success else 0) + (1 if hot_rank_success else 0) + (1 if hot_up_success else 0) + (1 if hsgt_success else 0) + (1 if fund_flow_rank_success else 0)
         total_tasks = 6
@@ -169,7 +130,7 @@ def collect_today_data():
             "updated_records": f"约{stock_count}条" if stock_success else "0条",
             "start_time": start_time.strftime('%H:%M:%S'),
             "end_time": end_time.strftime('%H:%M:%S'),
-            "duration": f"{duration.total_seconds():.1f}秒",
+            "duration": f"{duration:.1f}秒",
             "today_status": "✅ 成功" if stock_success else "❌ 失败",
             "index_status": "✅ 成功" if index_success else "❌ 失败",
             "hot_rank_status": "✅ 成功" if hot_rank_success else "❌ 失败",
@@ -191,7 +152,7 @@ def collect_today_data():
             send_completion_notice(
                 "当日数据采集", 
                 overall_success,
-                {"成功任务": f"{success_count}/6", "执行时间": f"{duration.total_seconds():.1f}秒"}
+                {"成功任务": f"{success_count}/6", "执行时间": f"{duration:.1f}秒"}
             )
         except:
             pass
@@ -212,24 +173,30 @@ def main():
     # 断点续传控制
     parser.add_argument('--no-resume', action='store_true', help='禁用断点续传功能')
     
-    # 延时控制参数
-    parser.add_argument('--base-delay', type=float, default=0.2, help='基础延时(秒), 默认0.2')
-    parser.add_argument('--random-delay', type=float, default=0.3, help='随机延时范围(秒), 默认0.3')
-    parser.add_argument('--batch-delay', type=float, default=2.0, help='批次间延时(秒), 默认2.0')
-    parser.add_argument('--batch-size', type=int, default=100, help='批次大小, 默认100')
+    # 延时控制参数（已弃用：请求频率统一由 AKSHARE_RATE_LIMIT 全局限速器控制，保留参数仅为兼容旧脚本）
+    parser.add_argument('--base-delay', type=float, default=None, help='已弃用，请使用 AKSHARE_RATE_LIMIT')
+    parser.add_argument('--random-delay', type=float, default=None, help='已弃用，请使用 AKSHARE_RATE_LIMIT')
+    parser.add_argument('--batch-delay', type=float, default=None, help='已弃用，请使用 AKSHARE_RATE_LIMIT')
+    parser.add_argument('--batch-size', type=int, default=None, help='已弃用，请使用 AKSHARE_RATE_LIMIT')
+    parser.add_argument('--max-workers', type=int, default=None, help='历史行情并发采集线程数, 默认读取 AKSHARE_MAX_WORKERS')
     
     args = parser.parse_args()
     
     # 设置日志
     setup_logging()
     
-    # 构建延时配置
-    delay_config = {
-        'base_delay': args.base_delay,
-        'random_delay': args.random_delay,
-        'batch_delay': args.batch_delay,
-        'batch_size': args.batch_size
-    }
+    # 旧的延时参数已不再生效，传入时给出提示
+    deprecated_flags = [
+        flag for flag, value in (
+            ('--base-delay', args.base_delay),
+            ('--random-delay', args.random_delay),
+            ('--batch-delay', args.batch_delay),
+            ('--batch-size', args.batch_size),
+        ) if value is not None
+    ]
+    if deprecated_flags:
+        logger.warning(f"参数 {', '.join(deprecated_flags)} 已弃用且不再生效，"
+                       f"请求频率由 AKSHARE_RATE_LIMIT 控制（当前每秒 {config.AKSHARE_RATE_LIMIT} 次）")
     
     # 断点续传配置
     enable_resume = not args.no_resume
@@ -239,7 +206,7 @@ def main():
             if not args.start_date:
                 logger.error("采集历史数据需要指定开始日期 --start-date")
                 return
-            collect_historical_data(args.start_date, args.end_date, enable_resume, delay_config)
+            collect_historical_data(args.start_date, args.end_date, enable_resume, args.max_workers)
             
         elif args.action == 'today':
             collect_today_data()
@@ -4,15 +4,18 @@
 定时任务调度器
 """
 
-import schedule
-import time
 import os
 import sys
-from datetime import datetime
+import time
 from loguru import logger
-from main import collect_today_data
-from collectors import stock_basic_collector, stock_news_collector
-from feishu_notify import send_completion_notice
+from apscheduler.executors.pool import ThreadPoolExecutor
+from apscheduler.schedulers.blocking import BlockingScheduler
+from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
+from config import config
+from utils.logger import STDOUT_FORMAT, FILE_FORMAT
+
+# 采集相关模块（akshare、pandas、supabase 等）在各任务函数内按需导入，调度器启动时不加载
 
 
 def setup_scheduler_logging():
@@ -20,15 +23,17 @@ def setup_scheduler_logging():
     logger.remove()
     logger.add(
         sys.stdout,
-        format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | {message}",
+        format=STDOUT_FORMAT,
         level="INFO"
     )
     logger.add(
         "logs/scheduler_{time:YYYY-MM-DD}.log",
-        format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {message}",
+        format=FILE_FORMAT,
+        colorize=False,
         level="INFO",
         rotation="1 day",
-        retention="30 days"
+        retention="30 days",
+        enqueue=True  # 后台线程写盘，线程池中并发执行的任务记录日志时不阻塞
     )
 
 
@@ -36,6 +41,7 @@ def job_daily_update():
     """每日数据更新任务"""
     logger.info("开始执行每日数据更新任务")
     try:
+        from main import collect_today_data
         collect_today_data()
         logger.info("每日数据更新任务完成")
     except Exception as e:
@@ -47,6 +53,7 @@ def job_weekly_update():
     logger.info("开始执行每周数据更新任务")
     try:
         # 更新股票基础信息
+        from collectors import stock_basic_collector
         stock_basic_collector.collect()
         logger.info("每周数据更新任务完成")
     except Exception as e:
@@ -56,53 +63,44 @@ def job_weekly_update():
 def job_news_update():
     """新闻数据更新任务"""
     logger.info("开始执行东方财富全球财经快讯采集任务")
-    start_time = datetime.now()
+    start_time = time.perf_counter()
+    from feishu_notify import enqueue_completion_notice
     
     try:
-        # 获取采集前统计
-        stats_before = stock_news_collector.get_news_stats()
-        count_before = stats_before.get('total_news', 0)
+        from collectors import stock_news_collector
+        # 新增及重复条数由采集结果直接给出，无需采集前后各统计一次全表
+        success, new_count, duplicate_count = stock_news_collector.collect_news(
+            max_process_count=config.NEWS_MAX_PROCESS_COUNT
+        )
         
-        # 限制每次处理10条新闻
-        success = stock_news_collector.collect_news(max_process_count=10)
-        
-        # 获取采集后统计
-        stats_after = stock_news_collector.get_news_stats()
-        count_after = stats_after.get('total_news', 0)
-        new_count = count_after - count_before
-        
-        end_time = datetime.now()
-        duration = (end_time - start_time).total_seconds()
+        duration = time.perf_counter() - start_time
         
         # 准备飞书通知详情
         details = {
             "采集耗时": f"{duration:.1f}秒",
-            "采集前总数": f"{count_before}条",
-            "采集后总数": f"{count_after}条", 
             "新增新闻": f"{new_count}条",
-            "重复数据": f"{10 - new_count}条" if new_count <= 10 else "0条",
+            "重复数据": f"{duplicate_count}条",
             "数据来源": "东方财富全球财经快讯"
         }
         
         if success:
-            logger.info(f"东方财富全球财经快讯采集任务完成 - 新增{new_count}条，重复{10-new_count if new_count <= 10 else 0}条")
-            # 发送成功通知到飞书
-            send_completion_notice("东方财富全球财经快讯采集", True, details)
+            logger.info(f"东方财富全球财经快讯采集任务完成 - 新增{new_count}条，重复{duplicate_count}条")
+            # 成功通知加入飞书批量队列
+            enqueue_completion_notice("东方财富全球财经快讯采集", True, details)
         else:
             logger.warning("东方财富全球财经快讯采集任务失败")
-            # 发送失败通知到飞书
-            send_completion_notice("东方财富全球财经快讯采集", False, details)
+            # 失败通知加入飞书批量队列
+            enqueue_completion_notice("东方财富全球财经快讯采集", False, details)
             
     except Exception as e:
         logger.error(f"东方财富全球财经快讯采集任务异常: {e}")
-        # 发送异常通知到飞书
-        end_time = datetime.now()
-        duration = (end_time - start_time).total_seconds()
+        # 异常通知加入飞书批量队列
+        duration = time.perf_counter() - start_time
         error_details = {
             "错误信息": str(e),
             "执行耗时": f"{duration:.1f}秒"
         }
-        send_completion_notice("东方财富全球财经快讯采集", False, error_details)
+        enqueue_completion_notice("东方财富全球财经快讯采集", False, error_details)
 
 
 def job_health_check():
@@ -111,19 +109,19 @@ def job_health_check():
     # 可以在这里添加数据质量检查、系统状态检查等
 
 
-def setup_schedules():
+def setup_schedules(scheduler: BlockingScheduler):
     """设置定时任务"""
     # 每日18:00执行数据更新（收盘后）
-    schedule.every().day.at("18:00").do(job_daily_update)
+    scheduler.add_job(job_daily_update, CronTrigger(hour=18, minute=0), id='daily_update')
     
     # 每周日凌晨2点执行基础信息更新
-    schedule.every().sunday.at("02:00").do(job_weekly_update)
+    scheduler.add_job(job_weekly_update, CronTrigger(day_of_week='sun', hour=2, minute=0), id='weekly_update')
     
     # 每20分钟执行新闻采集
-    schedule.every(20).minutes.do(job_news_update)
+    scheduler.add_job(job_news_update, IntervalTrigger(minutes=20), id='news_update')
     
     # 每小时执行健康检查
-    schedule.every().hour.do(job_health_check)
+    scheduler.add_job(job_health_check, IntervalTrigger(hours=1), id='health_check')
     
     logger.info("定时任务设置完成:")
     logger.info("- 每日18:00: 数据更新")
@@ -139,8 +137,15 @@ def run_scheduler():
     # 设置日志
     setup_scheduler_logging()
     
-    # 设置定时任务
-    setup_schedules()
+    # 设置定时任务：由调度器按触发时间唤醒，无需每分钟轮询
+    # 任务在线程池中执行，耗时较长的每日采集不会阻塞新闻采集和健康检查；
+    # 同一任务不重叠执行，错过的多次触发（如系统休眠后）合并为一次
+    scheduler = BlockingScheduler(
+        executors={'default': ThreadPoolExecutor(4)},
+        job_defaults={'max_instances': 1, 'coalesce': True},
+        timezone=config.TIMEZONE
+    )
+    setup_schedules(scheduler)
     
     # 立即执行一次新闻采集
     logger.info("立即执行一次新闻采集...")
@@ -149,10 +154,8 @@ def run_scheduler():
     logger.info("调度器正在运行，按 Ctrl+C 停止")
     
     try:
-        while True:
-            schedule.run_pending()
-            time.sleep(60)  # 每分钟检查一次
-    except KeyboardInterrupt:
+        scheduler.start()
+    except (KeyboardInterrupt, SystemExit):
         logger.info("调度器已停止")
 
 
@@ -6,14 +6,20 @@
 
 from .logger import setup_logger
 from .retry import retry_with_backoff
+from .rate_limit import RateLimiter
+from .http_session import install_shared_session
 from .date_utils import get_trade_dates, is_trade_date
-from .file_utils import ensure_directory, cleanup_old_files
+from .file_utils import ensure_directory, cleanup_old_files, list_files, tail_file
 
 __all__ = [
     'setup_logger',
     'retry_with_backoff', 
+    'RateLimiter',
+    'install_shared_session',
     'get_trade_dates',
     'is_trade_date',
     'ensure_directory',
-    'cleanup_old_files'
+    'cleanup_old_files',
+    'list_files',
+    'tail_file'
 ] 
\ No newline at end of file
@@ -4,7 +4,8 @@
 日期工具
 """
 
-from datetime import datetime, timedelta
+import functools
+from datetime import datetime
 from typing import List
 
 
@@ -19,20 +20,22 @@ def get_trade_dates(start_date: str, end_date: str) -> List[str]:
     Returns:
         交易日期列表
     """
-    start = datetime.strptime(start_date, '%Y%m%d')
-    end = datetime.strptime(end_date, '%Y%m%d')
+    # numpy 只在需要时导入，不访问日期工具的命令（如 system config）无需加载
+    import numpy as np
     
-    dates = []
-    current = start
-    while current <= end:
-        # 排除周末
-        if current.weekday() < 5:  # 0-4 是周一到周五
-            dates.append(current.strftime('%Y%m%d'))
-        current += timedelta(days=1)
+    start = np.datetime64(datetime.strptime(start_date, '%Y%m%d').date(), 'D')
+    end = np.datetime64(datetime.strptime(end_date, '%Y%m%d').date(), 'D')
     
-    return dates
+    # 一次生成整个日期区间，按工作日掩码排除周末
+    days = np.arange(start, end + 1, dtype='datetime64[D]')
+    days = days[np.is_busday(days)]
+    if days.size == 0:
+        return []
+    
+    return np.char.replace(np.datetime_as_string(days, unit='D'), '-', '').tolist()
 
 
+@functools.lru_cache(maxsize=4096)
 def is_trade_date(date_str: str) -> bool:
     """
     判断是否为交易日（简化版，排除周末）
@@ -43,5 +46,4 @@ def is_trade_date(date_str: str) -> bool:
     Returns:
         是否为交易日
     """
-    date = datetime.strptime(date_str, '%Y%m%d')
-    return date.weekday() < 5 
\ No newline at end of file
+    return datetime.strptime(date_str, '%Y%m%d').weekday() < 5
@@ -5,6 +5,7 @@
 """
 
 import os
+import fnmatch
 from pathlib import Path
 from datetime import datetime, timedelta
 
@@ -14,6 +15,33 @@ def ensure_directory(path) -> None:
     Path(path).mkdir(parents=True, exist_ok=True)
 
 
+def list_files(directory, pattern: str = "*") -> list:
+    """
+    列出目录下匹配的文件，按修改时间从旧到新排序
+    
+    使用 os.scandir 遍历，每个文件只 stat 一次
+    
+    Args:
+        directory: 目录路径
+        pattern: 文件匹配模式
+    
+    Returns:
+        (文件路径, 修改时间戳) 列表
+    """
+    if not os.path.isdir(directory):
+        return []
+    
+    with os.scandir(directory) as entries:
+        files = [
+            (Path(entry.path), entry.stat().st_mtime)
+            for entry in entries
+            if entry.is_file() and fnmatch.fnmatch(entry.name, pattern)
+        ]
+    
+    files.sort(key=lambda item: item[1])
+    return files
+
+
 def cleanup_old_files(directory, days: int = 30, pattern: str = "*") -> int:
     """
     清理指定天数前的文件
@@ -26,18 +54,41 @@ def cleanup_old_files(directory, days: int = 30, pattern: str = "*") -> int:
     Returns:
         清理的文件数量
     """
-    directory = Path(directory)
-    if not directory.exists():
-        return 0
-    
-    cutoff_date = datetime.now() - timedelta(days=days)
+    cutoff_time = (datetime.now() - timedelta(days=days)).timestamp()
     count = 0
     
-    for file_path in directory.glob(pattern):
-        if file_path.is_file():
-            file_time = datetime.fromtimestamp(file_path.stat().st_mtime)
-            if file_time < cutoff_date:
-                file_path.unlink()
-                count += 1
+    for file_path, mtime in list_files(directory, pattern):
+        if mtime >= cutoff_time:
+            # 列表按修改时间排序，后面的文件都更新
+            break
+        file_path.unlink()
+        count += 1
+    
+    return count 
+
+
+def tail_file(path, lines: int = 20, block_size: int = 4096) -> list:
+    """
+    读取文件末尾若干行（从文件尾部按块倒序读取，无需读入整个文件）
+    
+    Args:
+        path: 文件路径
+        lines: 读取行数
+        block_size: 每次读取的字节数
+    
+    Returns:
+        末尾各行文本列表
+    """
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        data = b''
+        
+        # 多读一行，保证第一行是完整的
+        while position > 0 and data.count(b'\n') <= lines:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
     
-    return count 
\ No newline at end of file
+    return [line.decode('utf-8', errors='replace') for line in data.splitlines()[-lines:]]
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP 连接复用工具
+"""
+
+import sys
+import threading
+import types
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+# requests 在安装时才导入，避免 run.py system 等不采集数据的命令在启动时加载
+_session = None
+_lock = threading.Lock()
+
+
+# 服务端限流时未给出 Retry-After 的默认暂停秒数
+DEFAULT_THROTTLE_SECONDS = 5.0
+
+
+def parse_retry_after(value: Optional[str], default: float = DEFAULT_THROTTLE_SECONDS) -> float:
+    """解析 Retry-After 响应头（秒数或 HTTP 日期），无法解析时返回 default"""
+    if not value:
+        return default
+    
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return default
+
+
+def install_shared_session(pool_size: int = 64,
+                           on_throttle: Optional[Callable[[float], None]] = None,
+                           module_prefix: str = 'akshare') -> 'requests.Session':
+    """
+    让 akshare 各模块中的 requests.get / requests.post 复用同一个 Session
+    
+    akshare 内部直接调用 requests.get / requests.post，每次都会新建 TCP + TLS 连接；
+    把已导入的 module_prefix 模块中的 requests 引用替换为代理模块，其 get / post / request
+    走共享 Session，同一域名的请求可复用连接池中的长连接。
+    只影响这些模块，进程中其他代码使用的 requests 不受影响；Session 不保存 Cookie，
+    各接口之间不会互相带上对方的 Cookie。需在 import akshare 之后调用，重复调用只会安装一次。
+    
+    Args:
+        pool_size: 每个域名保留的连接数，应不小于并发采集线程数
+        on_throttle: 响应为 429/503 时的回调，参数为 Retry-After 给出的等待秒数
+        module_prefix: 需要替换 requests 引用的模块名前缀
+    """
+    global _session
+    
+    with _lock:
+        if _session is None:
+            import requests
+            from http.cookiejar import DefaultCookiePolicy
+            from requests.adapters import HTTPAdapter
+            
+            session = requests.Session()
+            # 与逐次调用 requests.get 一致，不在请求之间保留 Cookie
+            session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+            # 重试由上层 retry_with_backoff 负责，这里不再重试
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            
+            if on_throttle is not None:
+                def _throttle_hook(response, *args, **kwargs):
+                    if response.status_code in (429, 503):
+                        on_throttle(parse_retry_after(response.headers.get('Retry-After')))
+                
+                session.hooks['response'].append(_throttle_hook)
+            
+            # 代理模块：复制 requests 的全部属性，只把请求方法换成共享 Session 的同名方法
+            proxy = types.ModuleType('requests')
+            proxy.__dict__.update(requests.__dict__)
+            proxy.get = session.get
+            proxy.post = session.post
+            proxy.request = session.request
+            
+            for name, module in list(sys.modules.items()):
+                if (name == module_prefix or name.startswith(module_prefix + '.')) \
+                        and getattr(module, 'requests', None) is requests:
+                    module.requests = proxy
+            
+            _session = session
+    
+    return _session
@@ -5,45 +5,60 @@
 """
 
 import sys
+import threading
 from typing import Optional
 from loguru import logger
 from pathlib import Path
 from config import config
 
 
+# 控制台带颜色标记，文件输出使用纯文本格式
+STDOUT_FORMAT = "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan> | {message}"
+FILE_FORMAT = "{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name} | {message}"
+
+# 已完成配置的日志名称，控制台输出只在首次调用时配置一次，文件输出每个名称只添加一次
+_configured_names = set()
+_configure_lock = threading.Lock()
+
+
 def setup_logger(name: str = "default", log_file: Optional[str] = None):
     """
     设置日志配置
     
+    重复调用不会重新安装已有的输出，只返回绑定名称的日志记录器
+    
     Args:
         name: 日志名称
         log_file: 日志文件名（可选）
     """
-    # 清除默认配置
-    logger.remove()
-    
-    # 控制台输出
-    logger.add(
-        sys.stdout,
-        format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan> | {message}",
-        level=config.LOG_LEVEL,
-        filter=lambda record: record["extra"].get("name") == name
-    )
-    
-    # 文件输出
-    if log_file:
-        log_path = config.LOGS_DIR / log_file
-    else:
-        log_path = config.LOGS_DIR / f"{name}_{'{time:YYYY-MM-DD}'}.log"
-    
-    logger.add(
-        str(log_path),
-        format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name} | {message}",
-        level=config.LOG_LEVEL,
-        rotation="1 day",
-        retention=f"{config.LOG_RETENTION_DAYS} days",
-        filter=lambda record: record["extra"].get("name") == name
-    )
+    with _configure_lock:
+        if not _configured_names:
+            # 清除默认配置，控制台输出全局只添加一次
+            logger.remove()
+            logger.add(
+                sys.stdout,
+                format=STDOUT_FORMAT,
+                level=config.LOG_LEVEL
+            )
+        
+        if name not in _configured_names:
+            # 文件输出（enqueue 交由后台线程写盘，并发采集线程记录日志时不阻塞在文件写入上）
+            if log_file:
+                log_path = config.LOGS_DIR / log_file
+            else:
+                log_path = config.LOGS_DIR / f"{name}_{'{time:YYYY-MM-DD}'}.log"
+            
+            logger.add(
+                str(log_path),
+                format=FILE_FORMAT,
+                colorize=False,
+                level=config.LOG_LEVEL,
+                rotation="1 day",
+                retention=f"{config.LOG_RETENTION_DAYS} days",
+                enqueue=True,
+                filter=lambda record, n=name: record["extra"].get("name") == n
+            )
+            _configured_names.add(name)
     
     return logger.bind(name=name)
 
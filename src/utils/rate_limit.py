@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+限速工具
+"""
+
+import time
+import threading
+from typing import Optional
+
+
+class RateLimiter:
+    """
+    线程安全的令牌桶限速器
+    
+    令牌按固定速率补充，桶内有令牌时立即放行，只有令牌耗尽时才等待，
+    多个线程共享同一实例即可共同遵守同一个频率上限。
+    """
+    
+    def __init__(self, rate: float, period: float = 1.0, burst: Optional[int] = None):
+        """
+        Args:
+            rate: 每个周期允许的请求数
+            period: 周期长度（秒）
+            burst: 桶容量（允许的突发请求数），默认等于 rate
+        """
+        if rate <= 0 or period <= 0:
+            raise ValueError("rate 和 period 必须大于0")
+        
+        self.capacity = burst or max(1, int(rate))
+        self.fill_rate = rate / period
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+    
+    def acquire(self) -> None:
+        """获取一个令牌，令牌不足时阻塞等待"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    # 暂停期间不补充令牌，恢复后从空桶开始按正常速率放行
+                    self._updated = self._paused_until
+                    wait_time = self._paused_until - now
+                else:
+                    self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.fill_rate)
+                    self._updated = now
+                    
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    
+                    wait_time = (1 - self._tokens) / self.fill_rate
+            
+            time.sleep(wait_time)
+    
+    def pause(self, seconds: float) -> None:
+        """暂停放行 seconds 秒（如服务端返回 429/Retry-After 时），并清空桶内令牌"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+    
+    def __enter__(self):
+        self.acquire()
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
@@ -5,15 +5,19 @@
 """
 
 import time
+import random
 import functools
-from typing import Callable, Any
+from typing import Callable, Any, Optional
 
 
 def retry_with_backoff(
     max_retries: int = 3,
     delay: float = 1.0,
     backoff: float = 2.0,
-    exceptions: tuple = (Exception,)
+    exceptions: tuple = (Exception,),
+    jitter: float = 0.0,
+    max_delay: Optional[float] = None,
+    giveup: Optional[Callable[[Exception], bool]] = None
 ):
     """
     带退避机制的重试装饰器
@@ -23,6 +27,9 @@ def retry_with_backoff(
         delay: 初始延时（秒）
         backoff: 退避倍数
         exceptions: 需要重试的异常类型
+        jitter: 随机抖动比例，实际延时在 [1-jitter, 1+jitter] 倍之间浮动，避免并发请求同时重试
+        max_delay: 单次延时上限（秒）
+        giveup: 判断异常是否不可重试，返回 True 时直接抛出（如客户端 4xx 错误）
     """
     def decorator(func: Callable) -> Callable:
         @functools.wraps(func)
@@ -33,12 +40,18 @@ def retry_with_backoff(
                 try:
                     return func(*args, **kwargs)
                 except exceptions as e:
-                    if attempt == max_retries:
+                    if attempt == max_retries or (giveup is not None and giveup(e)):
                         raise
                     
-                    time.sleep(current_delay)
+                    sleep_time = current_delay
+                    if jitter:
+                        sleep_time *= random.uniform(1 - jitter, 1 + jitter)
+                    time.sleep(sleep_time)
+                    
                     current_delay *= backoff
+                    if max_delay is not None:
+                        current_delay = min(current_delay, max_delay)
             
             return None
         return wrapper
-    return decorator 
\ No newline at end of file
+    return decorator